@@ -0,0 +1,60 @@
+"""
+Compares building analysis entries one row at a time, decoding each entry's
+data as it is created, with building them in batch through Entry.from_frame
+
+Usage: python benchmark_entries.py <boards directory> [entry count]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.model.boards import Finder
+from src.model.entrylib import Entry
+
+
+def generate_entries(board_finder, count):
+    """
+    Makes a table of entries with random data on the boards that have data types
+    """
+
+    rng = np.random.default_rng(865)
+    entry_boards = [b for b in board_finder.boards if b.logs]
+    return pd.DataFrame({
+        "Match": rng.integers(1, 120, count),
+        "Team": rng.integers(1, 8000, count),
+        "Name": ["scout{}".format(i % 40) for i in range(count)],
+        "Board": [entry_boards[i % len(entry_boards)].name() for i in range(count)],
+        "Data": ["".join("{:04x}".format(rng.integers(0, len(entry_boards[i % len(entry_boards)].logs)) << 8 |
+                                         rng.integers(0, 151)) for _ in range(60))
+                 for i in range(count)]
+    })
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__.strip())
+        sys.exit(1)
+
+    board_finder = Finder(sys.argv[1])
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    entries_table = generate_entries(board_finder, count)
+
+    start = time.perf_counter()
+    for _, row in entries_table.iterrows():
+        Entry(row, board_finder)
+    row_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    Entry.from_frame(entries_table, board_finder)
+    frame_time = time.perf_counter() - start
+
+    print("{} entries".format(count))
+    print("Entry(row):  {:.3f}s".format(row_time))
+    print("from_frame:  {:.3f}s ({:.1f}x)".format(frame_time, row_time / frame_time))
+
+
+if __name__ == "__main__":
+    main()
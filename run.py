@@ -1,3 +1,4 @@
 from src.ui.main import run_app
 
-run_app()
\ No newline at end of file
+if __name__ == "__main__":
+    run_app()
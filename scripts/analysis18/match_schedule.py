@@ -11,6 +11,7 @@ LABELS = ["Red 1",
           "Blue 2",
           "Blue 3"
           ]
+EXTERNAL_INPUTS = True
 
 
 def compute_table(_):
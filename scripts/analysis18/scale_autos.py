@@ -1,5 +1,3 @@
-from itertools import chain
-
 import numpy as np
 import pandas as pd
 
@@ -13,39 +11,35 @@ LABELS = ["Team",
           ]
 
 
-def get_autos_data(manager):
-    scale_autos = {}
+def get_teams(manager):
+    teams = {}
     for entry in manager.entries:
         if not entry.board.alliance() == "N":  # Check for Power ups
+            teams[entry.team] = None
 
-            if entry.team not in scale_autos.keys():  # Make new list if team doesn't exist
-                scale_autos[entry.team] = []
-
-            scale_autos[entry.team].append((entry.look("Auto scale attempt"), entry.look("Auto scale")))
-
-    return scale_autos
+    return teams.keys()
 
 
 def get_rows(manager):
-    for team, auto_data in get_autos_data(manager).items():
-        attempt, success = zip(*auto_data)
-
-        attempt_counts = list(filter(bool, map(len, attempt)))
-        success_counts = list(filter(bool, map(len, success)))
-        attempt_success_counts = list(filter(bool, map(lambda x: sum(map(len, x)), auto_data)))
+    events = manager.events(types=["Auto scale attempt", "Auto scale"], alliance_not="N")
+    events_by_team = dict(tuple(events.groupby("Team")))
 
-        success_times = list(chain(*success))
+    for team in get_teams(manager):
+        team_events = events_by_team.get(team, events.iloc[:0])
+        success = team_events[team_events["Type"] == "Auto scale"]
 
-        attempt_sum = sum(attempt_counts)
-        success_sum = sum(success_counts)
+        # Counts per entry, only of entries that have any
+        attempt_success_counts = team_events["Entry"].value_counts()
+        success_counts = success["Entry"].value_counts()
 
-        attempt_success_sum = attempt_sum + success_sum
+        success_sum = len(success)
+        attempt_success_sum = len(team_events)
 
         yield {
             "Team": team,
-            "Max coded blocks": max(attempt_success_counts) if attempt_success_counts else np.nan,
-            "Maximum Success #": max(success_counts) if success_counts else np.nan,
-            "Fastest Success Time": min(success_times) if success_times else np.nan,
+            "Max coded blocks": attempt_success_counts.max() if attempt_success_sum else np.nan,
+            "Maximum Success #": success_counts.max() if success_sum else np.nan,
+            "Fastest Success Time": success["Value"].min() if success_sum else np.nan,
             "Success/Attempt Ratio": success_sum / attempt_success_sum if attempt_success_sum != 0 else np.nan
         }
 
@@ -10,6 +10,7 @@ LABELS = [
     "Blue 2",
     "Blue 3"
 ]
+DEPENDS = ["match_schedule"]
 
 
 def compute_table(manager):
@@ -9,38 +9,56 @@ LABELS = ["Team",
           "Average Opponent Switch",
           "Average Exchange"]
 
+COUNTED_TYPES = ["Tele scale",
+                 "Tele alliance switch",
+                 "Tele opponent switch",
+                 "Tele exchange"]
 
-def get_team_data(manager):
-    teams_data = {}
-    for entry in manager.entries:
-        if not entry.board.alliance() == "N":  # Check for Power ups
 
-            if entry.team not in teams_data.keys():  # Make new list if team doesn't exist
-                teams_data[entry.team] = []
+def avg(s, l):
+    return s / l if s > 0 and l > 0 else np.nan
+
 
-            teams_data[entry.team].append((entry.count("Tele scale"),
-                                           entry.count("Tele alliance switch"),
-                                           entry.count("Tele opponent switch"),
-                                           entry.count("Tele exchange")))
+def entry_totals(manager, entry):
+    """
+    The amounts an entry adds to its team's sums: the entry itself, then the count of each counted type
+    """
 
-    return teams_data
+    if entry.board.alliance() == "N":  # Check for Power ups
+        return None
+    return entry.team, np.array([1] + [entry.count(t) for t in COUNTED_TYPES])
 
 
-def avg(x):
-    return (lambda s, l: s / l if s > 0 and l > 0 else np.nan)(sum(x), len(x))
+def all_entry_totals(manager):
+    """
+    The entry_totals of every entry, counting the events of all entries in one query
+    """
 
+    events = manager.events(types=COUNTED_TYPES, alliance_not="N")
+    type_sums = events.groupby(["Entry", "Type"]).size()
+
+    totals = {}
+    for entry in manager.entries:
+        if not entry.board.alliance() == "N":  # Check for Power ups
+            totals[entry.index] = entry.team, np.array([1] + [type_sums.get((entry.index, t), 0)
+                                                              for t in COUNTED_TYPES])
+    return totals
 
-def get_rows(manager):
-    for team, counts in get_team_data(manager).items():
-        scale, a_switch, o_switch, exchange = zip(*counts)  # Counts when they don't do it
 
-        yield {"Team": team,
-               "Average Scale": avg(scale),
-               "Average Alliance Switch": avg(a_switch),
-               "Average Opponent Switch": avg(o_switch),
-               "Average Exchange": avg(exchange)
-               }
+def table_from_totals(manager, totals):
+    rows = []
+    for team, (entry_count, scale, a_switch, o_switch, exchange) in totals.items():  # Counts when they don't do it
+        rows.append({"Team": team,
+                     "Average Scale": avg(scale, entry_count),
+                     "Average Alliance Switch": avg(a_switch, entry_count),
+                     "Average Opponent Switch": avg(o_switch, entry_count),
+                     "Average Exchange": avg(exchange, entry_count)
+                     })
+    return pd.DataFrame(rows, columns=LABELS)
 
 
 def compute_table(manager):
-    return pd.DataFrame(get_rows(manager))[LABELS]
+    totals = {}
+    for team, values in all_entry_totals(manager).values():
+        totals[team] = totals.get(team, 0) + values
+    return table_from_totals(manager, totals)
@@ -63,6 +63,7 @@ LABELS = [
 
     "Double outtakes"
 ]
+EXTERNAL_INPUTS = True
 
 
 def raw_data_app(manager, entry):
@@ -9,6 +9,7 @@ LABELS = ["Scout",
           "Double outtakes",
           "Wrong auto line",
           "Wrong climb"]
+EXTERNAL_INPUTS = True
 
 
 def get_rows(manager):
@@ -18,6 +18,7 @@ LABELS = ["Team",
           "Action 4",
           "Action 5"
           ]
+EXTERNAL_INPUTS = True
 
 
 def get_rows(manager):
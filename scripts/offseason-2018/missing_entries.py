@@ -11,6 +11,7 @@ LABELS = ["Match #",
           "Blue 2",
           "Blue 3"
           ]
+DEPENDS = ["match_schedule"]
 
 
 def compute_table(manager):
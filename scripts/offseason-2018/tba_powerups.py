@@ -9,6 +9,7 @@ LABELS = ["Match",
           "Blue force played", "Blue force total",
           "Blue levitate played", "Blue levitate total",
           "Blue boost played", "Blue boost total"]
+EXTERNAL_INPUTS = True
 
 
 def row_data_generator(manager):
@@ -9,6 +9,7 @@ LABELS = ["Team",
           "Ties",
           "Losses",
           "Percent"]
+EXTERNAL_INPUTS = True
 
 
 def get_rows(manager):
@@ -1,13 +1,19 @@
+import hashlib
 import os
 import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from importlib import import_module
 
+import numpy as np
 import pandas as pd
+import sqlalchemy
 import xlwings as xl
 from tbapy import TBA
 
 from src.model import boards, database
-from src.model.entrylib import Entry
+from src.model.entrylib import Entry, EventStore
 
 
 class AnalysisManager:
@@ -17,28 +23,58 @@ class AnalysisManager:
             self.name = module.SOURCE_NAME
             self.labels = module.LABELS
             self.compute = module.compute_table
+
+            # Names of the tables that must be computed before this one
+            self.depends = getattr(module, "DEPENDS", [])
+
+            # Tables that read TBA or files can't tell when their inputs change,
+            # so they are computed again on every refresh and never saved
+            self.external = getattr(module, "EXTERNAL_INPUTS", False)
             self.data = pd.DataFrame(columns=self.labels)
 
+            # Identifies the inputs self.data was computed from, or None if it is out of date
+            self.fingerprint = None
+            with open(module.__file__, "rb") as f:
+                self.source_hash = hashlib.sha1(f.read()).hexdigest()
+
+            # Tables can instead be computed one entry at a time, so that only new
+            # or edited entries are computed again. compute_row(manager, entry) gives
+            # the row of an entry, while entry_totals(manager, entry) gives a key and
+            # an array added to the sums passed to table_from_totals(manager, totals).
+            # all_entry_totals(manager) can give the entry_totals of every entry at once,
+            # for when there are no results to reuse
+            self.compute_row = getattr(module, "compute_row", None)
+            self.entry_totals = getattr(module, "entry_totals", None)
+            self.all_entry_totals = getattr(module, "all_entry_totals", None)
+            self.table_from_totals = getattr(module, "table_from_totals", None)
+
+            # The results of each entry by index, the entry hashes they were computed
+            # from, and the fingerprint of the other inputs
+            self.entry_results = {}
+            self.entry_hashes = {}
+            self.totals = {}
+            self.base_fingerprint = None
+
+        def incremental(self):
+            return self.compute_row is not None or (self.entry_totals is not None and
+                                                    self.table_from_totals is not None)
+
     def __init__(self,
                  boards_dir_path,
                  db_path,
                  scripts_path,
                  table_scripts,
                  tba_key,
-                 tba_event):
+                 tba_event,
+                 lazy=False):
 
         self.boards_finder = boards.Finder(boards_dir_path)
 
         if not os.path.exists(db_path):
             raise FileNotFoundError("Database file not found")
 
-        conn = database.get_engine(db_path).connect()
-
-        entries_table = pd.read_sql(sql="SELECT * FROM EDITED_ENTRIES",
-                                    con=conn,
-                                    index_col="index").sort_values(by=['Match', 'Team'])
-
-        self.entries = [Entry(row, self.boards_finder) for _, row in entries_table.iterrows()]
+        self.engine = database.open_engine(db_path)
+        self.load_entries()
 
         if scripts_path not in sys.path:
             sys.path.append(scripts_path)
@@ -49,6 +85,140 @@ class AnalysisManager:
         self.tba_available = True
         self.tba_event = tba_event
 
+        # Whether tables are only computed when they are needed, instead of all at once
+        self.lazy = lazy
+
+        self.table_cache = None
+        self.matches = None
+        self.matches_lock = threading.Lock()
+
+        # Changed on every refresh to make tables with external inputs out of date
+        self.refresh_token = os.urandom(8).hex()
+
+    def refresh(self):
+        """
+        Marks the tables that read TBA or files as out of date, so they are computed again
+        """
+
+        self.refresh_token = os.urandom(8).hex()
+        with self.matches_lock:
+            self.matches = None
+
+    def load_entries(self):
+        """
+        Reads the edited entries from the database, so that entries saved
+        since the manager was created are used the next time tables are computed
+        """
+
+        with self.engine.connect() as conn:
+            # Other columns are only read if a table uses them
+            entries_table = pd.read_sql(sql='SELECT "index", Match, Team, Name, Board, Data, Edited '
+                                            'FROM EDITED_ENTRIES',
+                                        con=conn,
+                                        index_col="index").sort_values(by=['Match', 'Team'])
+
+        self.entries_fingerprint = self.fingerprint_entries(entries_table)
+        self.entry_hashes = dict(zip(entries_table.index.tolist(),
+                                     pd.util.hash_pandas_object(entries_table, index=False).tolist()))
+
+        # Decode the data of every entry in one pass
+        self.event_store = EventStore.from_hex(entries_table["Data"])
+        self.entry_columns = database.ColumnLoader(self.engine, "EDITED_ENTRIES")
+
+        self.entries = Entry.from_frame(entries_table, self.boards_finder,
+                                        store=self.event_store, columns=self.entry_columns)
+        self.entries_by_index = {entry.index: entry for entry in self.entries}
+
+    def event_matches(self):
+        """
+        Gets the matches of the event from TBA, only asking for them once per refresh
+        """
+
+        with self.matches_lock:
+            if self.matches is None:
+                self.matches = self.tba.event_matches(self.tba_event)
+            return self.matches
+
+    @staticmethod
+    def fingerprint_entries(entries_table):
+        """
+        Hashes the entries so that computed tables can tell if any entry was added, removed or edited
+        """
+
+        hashes = pd.util.hash_pandas_object(entries_table.reset_index(), index=False)
+        return hashlib.sha1(hashes.to_numpy().tobytes()).hexdigest()
+
+    def events(self, types=None, teams=None, alliance_not=None, include_undone=False):
+        """
+        Queries the saved events of the entries, so that only the needed rows
+        are read from the database instead of going through every entry
+        :param types: log strings of the events to get, or None for all types
+        :param teams: team numbers to get the events of, or None for all teams
+        :param alliance_not: leaves out entries on boards of this alliance (e.g. "N")
+        :param include_undone: whether to include events that have been undone
+        :return: A DataFrame with the columns Entry, Match, Team, Name, Board, \
+        Type, Value, State, Undo and Seq, sorted by match and team
+        """
+
+        params = {}
+
+        def bind(values):
+            names = []
+            for value in values:
+                name = "p{}".format(len(params))
+                params[name] = value
+                names.append(":" + name)
+            return ", ".join(names)
+
+        conditions = []
+
+        # Type indexes are specific to each board
+        if types is not None or alliance_not is not None:
+            board_conditions = []
+            for board in self.boards_finder.boards_by_name.values():
+                if alliance_not is not None and board.alliance() == alliance_not:
+                    continue
+                if types is None:
+                    board_conditions.append("E.Board = {}".format(bind([board.name()])))
+                else:
+                    type_indexes = [board.log_indexes[t] for t in types if t in board.log_indexes]
+                    if type_indexes:
+                        board_conditions.append("(E.Board = {} AND EV.type_index IN ({}))"
+                                                .format(bind([board.name()]), bind(type_indexes)))
+            conditions.append("({})".format(" OR ".join(board_conditions) or "0"))
+
+        if teams is not None:
+            conditions.append("E.Team IN ({})".format(bind(map(int, teams)) or "NULL"))
+
+        if not include_undone:
+            conditions.append("EV.undo = 0")
+
+        sql = ('SELECT E."index" AS Entry, E.Match, E.Team, E.Name, E.Board, EV.type_index AS Type, '
+               'EV.value AS Value, EV.state AS State, EV.undo AS Undo, EV.seq AS Seq '
+               'FROM EVENTS EV JOIN EDITED_ENTRIES E ON E."index" = EV.entry_id '
+               '{} ORDER BY E.Match, E.Team, E."index", EV.seq').format(
+            "WHERE " + " AND ".join(conditions) if conditions else "")
+
+        with self.engine.connect() as conn:
+            events = pd.read_sql(sql=sqlalchemy.text(sql), con=conn, params=params)
+
+        # Convert the type indexes back to log strings, one board at a time
+        type_index = events["Type"].to_numpy()
+        logs = np.empty(len(events), dtype=object)
+        for board_name, positions in events.groupby("Board").indices.items():
+            board = self.boards_finder.get_board_by_name(board_name)
+            board_types = type_index[positions]
+
+            # Data types that aren't on the board are left as None, like in Entry.type_index
+            known = board_types < len(board.logs)
+            logs[positions[known]] = board.log_array[board_types[known]]
+        events["Type"] = logs
+
+        events["State"] = events["State"].astype(bool)
+        events["Undo"] = events["Undo"].astype(bool)
+
+        return events
+
     def __getitem__(self, name):
 
         for table in self.tables:
@@ -56,22 +226,225 @@ class AnalysisManager:
                 return table
         return None
 
-    def compute_all(self, tba_available=True):
+    def dependencies(self):
+        """
+        Gets the tables that each table depends on, leaving out tables that are not loaded
+        :return: A dictionary of table name to a list of table names
+        """
+
+        names = {table.name for table in self.tables}
+        return {table.name: [d for d in table.depends if d in names] for table in self.tables}
+
+    def uses_external_inputs(self, name):
+        """
+        Checks if a table or any table it depends on reads TBA or files
+        """
+
+        return self[name].external or any(self.uses_external_inputs(d) for d in self.dependencies()[name])
+
+    def base_fingerprint(self, table):
+        """
+        Hashes what a table is computed from other than the entries: the script,
+        whether TBA is used and the fingerprints of the tables it depends on.
+        Tables with external inputs also include the current refresh
+        """
+
+        parts = [table.source_hash, str(self.tba_available)]
+        if table.external:
+            parts.append(self.refresh_token)
+        parts.extend("{}={}".format(name, self[name].fingerprint) for name in sorted(table.depends)
+                     if self[name] is not None)
+        return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+    def table_fingerprint(self, table):
+        """
+        Hashes everything a table is computed from, including the entries
+        """
+
+        parts = [self.entries_fingerprint, self.base_fingerprint(table)]
+        return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+    def update_rows(self, table):
+        """
+        Computes an incremental table, only going through the entries that were
+        added or edited since it was last computed with the same script and options
+        :return: The table
+        """
+
+        base = self.base_fingerprint(table)
+        if table.base_fingerprint != base:
+            table.entry_results, table.entry_hashes, table.totals = {}, {}, {}
+
+        # Results are only kept if every entry gets through
+        table.base_fingerprint = None
+
+        changed = [i for i, h in self.entry_hashes.items() if table.entry_hashes.get(i) != h]
+        removed = table.entry_hashes.keys() - self.entry_hashes.keys()
+
+        for index in removed | set(changed):
+            result = table.entry_results.pop(index, None)
+            if table.compute_row is None and result is not None:
+                key, values = result
+                table.totals[key] = table.totals[key] - values
+
+        if not table.entry_results and table.compute_row is None and table.all_entry_totals is not None:
+            all_totals = table.all_entry_totals(self)
+            for index in changed:
+                result = all_totals.get(index)
+                if result is not None:
+                    key, values = result
+                    table.totals[key] = table.totals.get(key, 0) + values
+                table.entry_results[index] = result
+            changed = []
+
+        for index in changed:
+            entry = self.entries_by_index[index]
+            if table.compute_row is not None:
+                table.entry_results[index] = table.compute_row(self, entry)
+            else:
+                result = table.entry_totals(self, entry)
+                if result is not None:
+                    key, values = result
+                    table.totals[key] = table.totals.get(key, 0) + values
+                table.entry_results[index] = result
+
+        table.entry_hashes = dict(self.entry_hashes)
+        table.base_fingerprint = base
+
+        results = (table.entry_results[entry.index] for entry in self.entries)
+        if table.compute_row is not None:
+            return pd.DataFrame([row for row in results if row is not None], columns=table.labels)
+
+        # Keys are given in the order they first appear in the entries, like computing from scratch
+        totals = {}
+        for result in results:
+            if result is not None and result[0] not in totals:
+                totals[result[0]] = table.totals[result[0]]
+        table.totals = dict(totals)
+        return table.table_from_totals(self, totals)
+
+    def compute_table(self, table):
+        """
+        Computes a table unless its inputs haven't changed since it was last computed
+        :return: whether the table was computed instead of reused
+        """
+
+        fingerprint = self.table_fingerprint(table)
+        if table.fingerprint == fingerprint:
+            return False
+
+        cached = None if self.uses_external_inputs(table.name) else self.table_cache.get(table.name)
+        if cached is not None and cached[0] == fingerprint and table.base_fingerprint is None:
+            table.data = database.load_table(cached[1])
+            table.fingerprint = fingerprint
+            return False
+
+        table.fingerprint = None
         try:
-            self.tba_available = tba_available
-            for table in self.tables:
-                table.data = table.compute(self)
+            table.data = self.update_rows(table) if table.incremental() else table.compute(self)
+            table.fingerprint = fingerprint
+            return True
         except:
-            import traceback
             traceback.print_exc()
+            return False
+
+    def with_dependencies(self, names):
+        """
+        Gets the names of tables along with every table they depend on, recursively
+        """
+
+        dependencies = self.dependencies()
+        needed = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name in dependencies and name not in needed:
+                needed.add(name)
+                stack.extend(dependencies[name])
+        return needed
+
+    def is_computed(self, name):
+        """
+        Checks if a table and the tables it depends on are up to date with the entries and options
+        """
+
+        table = self[name]
+        return (table.fingerprint is not None and
+                all(self.is_computed(d) for d in self.dependencies()[name]) and
+                table.fingerprint == self.table_fingerprint(table))
+
+    def compute_all(self, tba_available=True, on_table_computed=None, refresh=True):
+        """
+        Computes every table, running tables that don't depend on each other
+        at the same time. A table starts once all of its DEPENDS are computed.
+        Tables whose inputs haven't changed are taken from the cache in the database,
+        while tables that read TBA or files are always computed again
+        :param on_table_computed: called with each table as soon as it is done
+        :param refresh: whether to compute the tables that read TBA or files again
+        """
+
+        self.compute([table.name for table in self.tables], tba_available, on_table_computed, refresh)
+
+    def compute(self, names, tba_available=None, on_table_computed=None, refresh=False):
+        """
+        Computes some of the tables and the tables they depend on, like compute_all
+        :param names: names of the tables to compute
+        :param tba_available: whether to use TBA, or None to keep the last setting
+        :param on_table_computed: called with each table as soon as it is done
+        :param refresh: whether to compute the tables that read TBA or files again
+        """
+
+        if tba_available is not None:
+            self.tba_available = tba_available
+
+        if refresh:
+            self.refresh()
+
+        if self.table_cache is None:
+            self.table_cache = database.read_table_cache(self.engine)
+
+        needed = self.with_dependencies(names)
+        waiting = {name: depends for name, depends in self.dependencies().items() if name in needed}
+        computed = set()
+        changed = []
+
+        with ThreadPoolExecutor() as executor:
+            running = {}
+            while waiting or running:
+                for name in [n for n, depends in waiting.items() if computed.issuperset(depends)]:
+                    del waiting[name]
+                    running[executor.submit(self.compute_table, self[name])] = name
+
+                if not running:
+                    print("Circular table dependencies:", ", ".join(waiting))
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    computed.add(name)
+                    if future.result():
+                        changed.append(self[name])
+                    if on_table_computed is not None:
+                        on_table_computed(self[name])
+
+        self.table_cache.update(database.write_table_cache(
+            self.engine, {table.name: (table.fingerprint, table.data) for table in changed
+                          if not self.uses_external_inputs(table.name)}))
 
     def open_excel_instance(self):
+        if self.lazy:
+            self.compute_all(self.tba_available, refresh=False)
+
         book = xl.Book()
         for table in self.tables:
             sheet = book.sheets.add(table.title)
             sheet.range("A1").options(pd.DataFrame, expand="table").value = table.data
 
     def save_csv_folder(self, path):
+        if self.lazy:
+            self.compute_all(self.tba_available, refresh=False)
+
         for table in self.tables:
             fp = os.path.join(path, "{}.csv".format(table.name))
             table.data.to_csv(fp)
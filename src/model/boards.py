@@ -5,6 +5,8 @@ Parses the board/specs files
 import json
 import os
 
+import numpy as np
+
 
 class Board:
     """Metadata about the robot scouted and the transmission constants"""
@@ -12,6 +14,13 @@ class Board:
     def __init__(self, specs):
         self.specs = specs
 
+        # Lookups between data indexes and log strings
+        self.logs = [d["log"] for d in specs["data"]]
+        self.log_array = np.array(self.logs, dtype=object)
+        self.log_indexes = {}
+        for i, log in enumerate(self.logs):
+            self.log_indexes.setdefault(log, i)
+
     def __str__(self):
         return str(self.specs)
 
@@ -34,10 +43,7 @@ class Board:
 
     def data_index_from_log(self, log_str):
         """Returns the index from the string id"""
-        for i, d in enumerate(self.specs["data"]):
-            if d["log"] == log_str:
-                return i
-        return -1
+        return self.log_indexes.get(log_str, -1)
 
     def dc(self, index):
         """Gets the data dictionary for a particular constant"""
@@ -53,7 +59,7 @@ class Board:
 
     def list_logs(self):
         """Returns a list of all the log strings"""
-        return list(map(lambda x: x["log"], self.specs["data"]))
+        return list(self.logs)
 
 
 class Finder:
@@ -74,11 +80,23 @@ class Finder:
             self.boards.append(board_obj)
             board_file.close()
 
+        self.boards_by_id = {}
+        for board_id, board_obj in zip(self.id_list, self.boards):
+            self.boards_by_id.setdefault(board_id, board_obj)
+
+        self.boards_by_name = {}
+        for name, board_obj in zip(self.names, self.boards):
+            self.boards_by_name.setdefault(name, board_obj)
+
     def get_board_by_id(self, board_id):
-        return self.boards[self.id_list.index(board_id)]
+        if board_id not in self.boards_by_id:
+            raise ValueError("Board id {} not found".format(board_id))
+        return self.boards_by_id[board_id]
 
     def get_board_by_name(self, name):
-        return self.boards[self.names.index(name)]
+        if name not in self.boards_by_name:
+            raise ValueError("Board {} not found".format(name))
+        return self.boards_by_name[name]
 
     def get_first(self):
         return self.boards[0]
@@ -2,9 +2,17 @@
 Manages the databases used for storing data
 """
 
+import json
+import math
+import threading
+
+import numpy as np
+import pandas as pd
 import sqlalchemy
 from sqlalchemy import types as sql_types
 
+from src.model.entrylib import EventStore
+
 RAW_HEADER = {
     "Match": sql_types.Integer,
     "Team": sql_types.Integer,
@@ -28,9 +36,312 @@ EDITED_HEADER = {
 }
 
 
+SQL_TYPE_NAMES = {
+    sql_types.Integer: "INTEGER",
+    sql_types.String: "TEXT"
+}
+
+
+# Applied to every new connection to a .warp7 file
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY"
+]
+
+
+class ColumnLoader:
+    """Reads columns of a table only when they are first needed"""
+
+    def __init__(self, engine, table):
+        self.engine = engine
+        self.table = table
+        self.columns = {}
+        self.lock = threading.Lock()
+
+    def get(self, column, index):
+        """
+        Gets the value of a column for one row, reading the whole column on first use
+        :param column: name of the column
+        :param index: value of the index column of the row
+        """
+
+        if column not in self.columns:
+            with self.lock:
+                if column not in self.columns:
+                    with self.engine.connect() as conn:
+                        rows = conn.execute(sqlalchemy.text('SELECT "index", "{}" FROM {}'
+                                                            .format(column, self.table)))
+                        self.columns[column] = dict(rows.fetchall())
+        return self.columns[column].get(index)
+
+
 def get_engine(file):
-    return sqlalchemy.create_engine(get_sqlite_uri(file))
+    engine = sqlalchemy.create_engine(get_sqlite_uri(file))
+    sqlalchemy.event.listen(engine, "connect", apply_pragmas)
+    return engine
 
 
 def get_sqlite_uri(file):
     return "sqlite:///" + file
+
+
+def apply_pragmas(dbapi_connection, _):
+    cursor = dbapi_connection.cursor()
+    for pragma in PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def create_entry_tables(conn):
+    """
+    Creates the entry tables if they don't exist, and makes sure the index
+    column is unique so that rows can be upserted by index
+    """
+
+    for name, header in (("RAW_ENTRIES", RAW_HEADER), ("EDITED_ENTRIES", EDITED_HEADER)):
+        columns = ", ".join('"{}" {}'.format(k, SQL_TYPE_NAMES[v]) for k, v in header.items())
+        conn.execute(sqlalchemy.text('CREATE TABLE IF NOT EXISTS {} ("index" INTEGER PRIMARY KEY, {})'
+                                     .format(name, columns)))
+
+        # Tables written by older versions have a plain index on the index column
+        conn.execute(sqlalchemy.text('CREATE UNIQUE INDEX IF NOT EXISTS "ux_{0}_index" ON {0} ("index")'
+                                     .format(name)))
+
+    conn.execute(sqlalchemy.text("CREATE TABLE IF NOT EXISTS SCAN_MANIFEST "
+                                 "(Path TEXT PRIMARY KEY, Size INTEGER, MTime REAL, Offset INTEGER)"))
+
+
+def create_entry_indexes(conn):
+    """
+    Creates indexes on the columns that entries are looked up by
+    """
+
+    for statement in ('CREATE INDEX IF NOT EXISTS "ix_EDITED_ENTRIES_match_team_name" '
+                      'ON EDITED_ENTRIES ("Match", "Team", "Name")',
+                      'CREATE INDEX IF NOT EXISTS "ix_EDITED_ENTRIES_team" ON EDITED_ENTRIES ("Team")',
+                      'CREATE INDEX IF NOT EXISTS "ix_EDITED_ENTRIES_name" ON EDITED_ENTRIES ("Name")',
+                      'CREATE INDEX IF NOT EXISTS "ix_EDITED_ENTRIES_raw_index" ON EDITED_ENTRIES ("RawIndex")'):
+        conn.execute(sqlalchemy.text(statement))
+
+
+def create_events_table(conn):
+    """
+    Creates the table of the decoded events of the edited entries, one row per datum,
+    and fills it from the data of the entries already in the file
+    """
+
+    conn.execute(sqlalchemy.text("CREATE TABLE IF NOT EXISTS EVENTS "
+                                 "(entry_id INTEGER, type_index INTEGER, value INTEGER, "
+                                 "undo INTEGER, state INTEGER, seq INTEGER, "
+                                 "PRIMARY KEY (entry_id, seq)) WITHOUT ROWID"))
+    conn.execute(sqlalchemy.text('CREATE INDEX IF NOT EXISTS "ix_EVENTS_type_index" ON EVENTS (type_index, entry_id)'))
+
+    rows = conn.execute(sqlalchemy.text('SELECT "index", Data FROM EDITED_ENTRIES')).fetchall()
+    write_events(conn, [index for index, _ in rows], [data for _, data in rows])
+
+
+def create_table_cache(conn):
+    """
+    Creates the table of computed analysis tables, so they can be reused across sessions
+    """
+
+    conn.execute(sqlalchemy.text("CREATE TABLE IF NOT EXISTS TABLE_CACHE "
+                                 "(Name TEXT PRIMARY KEY, Fingerprint TEXT, Data TEXT)"))
+
+
+# Changes to the schema, in order. A file at version n has had the first n applied
+MIGRATIONS = [
+    create_entry_tables,
+    create_entry_indexes,
+    create_events_table,
+    create_table_cache
+]
+
+
+def upgrade(conn):
+    """
+    Brings the schema of a .warp7 file up to date, in place
+    :param conn: connection of the transaction to upgrade in
+    """
+
+    conn.execute(sqlalchemy.text("CREATE TABLE IF NOT EXISTS SCHEMA_VERSION (Version INTEGER)"))
+    version = conn.execute(sqlalchemy.text("SELECT MAX(Version) FROM SCHEMA_VERSION")).scalar() or 0
+
+    for new_version in range(version + 1, len(MIGRATIONS) + 1):
+        MIGRATIONS[new_version - 1](conn)
+        conn.execute(sqlalchemy.text("INSERT INTO SCHEMA_VERSION (Version) VALUES (:version)"),
+                     {"version": new_version})
+
+
+def open_engine(file):
+    """
+    Returns an engine for a .warp7 file after upgrading its schema
+    """
+
+    engine = get_engine(file)
+    with engine.begin() as conn:
+        upgrade(conn)
+    return engine
+
+
+def checkpoint(engine):
+    """
+    Moves the changes kept in the write-ahead log into the .warp7 file itself,
+    so that a copy of the file taken while it is open has every saved row
+    """
+
+    with engine.connect() as conn:
+        conn.execute(sqlalchemy.text("PRAGMA wal_checkpoint(TRUNCATE)"))
+
+
+def sql_value(value):
+    """
+    Converts a value from a DataFrame into one that can be stored
+    """
+
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def upsert_entries(conn, name, header, rows):
+    """
+    Inserts entry rows, or updates them if a row with the same index exists
+    :param name: name of the entry table
+    :param header: the header of the table (RAW_HEADER or EDITED_HEADER)
+    :param rows: DataFrame of the rows to write, indexed by the index column
+    """
+
+    if rows.empty:
+        return
+
+    columns = ["index"] + list(header.keys())
+    params = ["p{}".format(i) for i in range(len(columns))]
+
+    statement = sqlalchemy.text('INSERT INTO {} ({}) VALUES ({}) ON CONFLICT ("index") DO UPDATE SET {}'.format(
+        name,
+        ", ".join('"{}"'.format(c) for c in columns),
+        ", ".join(":" + p for p in params),
+        ", ".join('"{0}" = excluded."{0}"'.format(c) for c in columns[1:])
+    ))
+
+    conn.execute(statement, [dict(zip(params, map(sql_value, row)))
+                             for row in rows[columns[1:]].itertuples(name=None)])
+
+
+def write_events(conn, entry_ids, encoded_data):
+    """
+    Replaces the rows of the EVENTS table for some edited entries
+    :param conn: connection of the transaction to write in
+    :param entry_ids: indexes of the entries in EDITED_ENTRIES
+    :param encoded_data: the hex encoded data of each entry
+    """
+
+    entry_ids = [int(i) for i in entry_ids]
+    if not entry_ids:
+        return
+
+    conn.execute(sqlalchemy.text("DELETE FROM EVENTS WHERE entry_id = :entry_id"),
+                 [{"entry_id": i} for i in entry_ids])
+
+    store = EventStore.from_hex(encoded_data)
+    if len(store.entry) == 0:
+        return
+
+    seq = np.arange(len(store.entry)) - store.offsets[store.entry]
+    columns = zip(np.array(entry_ids)[store.entry].tolist(),
+                  store.data_index.tolist(),
+                  store.value.tolist(),
+                  store.undo.tolist(),
+                  store.state.tolist(),
+                  seq.tolist())
+
+    conn.execute(sqlalchemy.text("INSERT INTO EVENTS (entry_id, type_index, value, undo, state, seq) "
+                                 "VALUES (:entry_id, :type_index, :value, :undo, :state, :seq)"),
+                 [{"entry_id": e, "type_index": t, "value": v, "undo": u, "state": st, "seq": q}
+                  for e, t, v, u, st, q in columns])
+
+
+def read_scan_manifest(engine):
+    """
+    Reads how far each scanned CSV file has been imported
+    :return: A dictionary of file path to (size, modified time, byte offset read)
+    """
+
+    with engine.begin() as conn:
+        rows = conn.execute(sqlalchemy.text("SELECT Path, Size, MTime, Offset FROM SCAN_MANIFEST")).fetchall()
+        return {path: (size, mtime, offset) for path, size, mtime, offset in rows}
+
+
+def write_scan_manifest(conn, manifest):
+    """
+    Saves how far each scanned CSV file has been imported
+    :param conn: connection of the transaction to write in
+    :param manifest: A dictionary of file path to (size, modified time, byte offset read)
+    """
+
+    if manifest:
+        conn.execute(sqlalchemy.text("INSERT OR REPLACE INTO SCAN_MANIFEST (Path, Size, MTime, Offset) "
+                                     "VALUES (:path, :size, :mtime, :offset)"),
+                     [{"path": path, "size": size, "mtime": mtime, "offset": offset}
+                      for path, (size, mtime, offset) in manifest.items()])
+
+
+def read_table_cache(engine):
+    """
+    Reads the analysis tables computed by previous sessions
+    :return: A dictionary of table name to (fingerprint, serialized DataFrame)
+    """
+
+    with engine.begin() as conn:
+        rows = conn.execute(sqlalchemy.text("SELECT Name, Fingerprint, Data FROM TABLE_CACHE")).fetchall()
+        return {name: (fingerprint, data) for name, fingerprint, data in rows}
+
+
+def write_table_cache(engine, tables):
+    """
+    Saves computed analysis tables, replacing older results of the same tables
+    :param tables: A dictionary of table name to (fingerprint, DataFrame)
+    :return: A dictionary of table name to (fingerprint, serialized DataFrame)
+    """
+
+    items = {name: (fingerprint, dump_table(data)) for name, (fingerprint, data) in tables.items()}
+    if items:
+        with engine.begin() as conn:
+            conn.execute(sqlalchemy.text("INSERT OR REPLACE INTO TABLE_CACHE (Name, Fingerprint, Data) "
+                                         "VALUES (:name, :fingerprint, :data)"),
+                         [{"name": name, "fingerprint": fingerprint, "data": data}
+                          for name, (fingerprint, data) in items.items()])
+        checkpoint(engine)
+    return items
+
+
+def dump_table(data):
+    """
+    Serializes a DataFrame as JSON text, keeping the type of each column.
+    .warp7 files are passed between computers, so nothing that can run code is stored
+    """
+
+    return json.dumps({"index": data.index.tolist(),
+                       "columns": [str(column) for column in data.columns],
+                       "dtypes": [str(dtype) for dtype in data.dtypes],
+                       "data": [data[column].tolist() for column in data.columns]},
+                      default=str)
+
+
+def load_table(text):
+    """
+    Reads a DataFrame saved by write_table_cache
+    """
+
+    saved = json.loads(text)
+    data = pd.DataFrame({column: pd.Series(values, dtype=None if dtype == "object" else dtype)
+                         for column, dtype, values in zip(saved["columns"], saved["dtypes"], saved["data"])},
+                        columns=saved["columns"])
+    data.index = saved["index"]
+    return data
@@ -1,3 +1,89 @@
+import numpy as np
+
+# Every datum from the app is a big-endian 16 bit integer
+DATUM_DTYPE = np.dtype(">u2")
+
+
+class EventStore:
+    """
+    Columnar storage of the decoded events of many entries
+    Each event takes 8 bytes across contiguous arrays, and the
+    events of one entry are found through the entry offsets
+    """
+
+    @classmethod
+    def from_hex(cls, hex_encodes):
+        """
+        Creates the store by decoding hex strings in bulk
+        :param hex_encodes: Sequence of hex encoded strings from the app
+        :return: The store, with one entry per string in order
+        """
+
+        *split_data, entry_ids = Entry.split_all(hex_encodes)
+        return cls(*split_data, entry_ids, len(hex_encodes))
+
+    @classmethod
+    def from_entries(cls, entries):
+        """
+        Creates the store from the decoded data of entries
+        Data with a log string unknown to the entry's board is left out
+        :param entries: Sequence of Entry objects
+        :return: The store, with one entry per Entry object in order
+        """
+
+        data_index, value, undo, state, entry_ids = [], [], [], [], []
+        for position, entry in enumerate(entries):
+            log_indexes = entry.board.log_indexes
+            for tt, ss, vv, uu in entry.decoded_data:
+                if tt in log_indexes:
+                    data_index.append(log_indexes[tt])
+                    value.append(int(vv))
+                    undo.append(bool(uu))
+                    state.append(bool(ss))
+                    entry_ids.append(position)
+
+        return cls(np.array(data_index, dtype=np.int64), np.array(value, dtype=np.int64),
+                   np.array(undo, dtype=bool), np.array(state, dtype=bool),
+                   np.array(entry_ids, dtype=np.int64), len(entries))
+
+    def __init__(self, data_index, value, undo, state, entry, entry_count):
+        self.data_index = data_index.astype(np.uint8)
+        self.value = value.astype(np.uint8)
+        self.undo = undo.astype(bool)
+        self.state = state.astype(bool)
+        self.entry = entry.astype(np.int32)
+
+        # Events are grouped by entry so each entry is a contiguous slice
+        self.offsets = np.searchsorted(self.entry, np.arange(entry_count + 1))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def events(self, position):
+        """
+        Gets the events of one entry
+        :param position: position of the entry in the store
+        :return: A tuple of array views (data_index, value, undo, state)
+        """
+
+        s = slice(self.offsets[position], self.offsets[position + 1])
+        return self.data_index[s], self.value[s], self.undo[s], self.state[s]
+
+    def to_hex(self):
+        """
+        Encodes the events of every entry back into hex strings
+        :return: A list of hex strings, one per entry
+        """
+
+        data = (self.undo.astype(np.uint16) << 15 |
+                self.state.astype(np.uint16) << 14 |
+                (self.data_index.astype(np.uint16) & ((1 << 6) - 1)) << 8 |
+                self.value)
+        encoded = data.astype(DATUM_DTYPE).tobytes().hex()
+
+        return [encoded[self.offsets[i] * 4:self.offsets[i + 1] * 4] for i in range(len(self))]
+
+
 class Entry:
 
     @staticmethod
@@ -19,6 +105,31 @@ class Entry:
 
             yield (data_type, value, undo_flag, state_flag)
 
+    @staticmethod
+    def split_all(hex_encodes):
+        """
+        Splits many hex strings at once into arrays of data
+        Performs the same bit extraction as split, but on one
+        uint16 view of every entry's data instead of per datum
+        :param hex_encodes: Iterable of hex encoded strings from the app
+        :return: A tuple of arrays (type, value, undo, state, entry_id)
+        """
+
+        hex_encodes = [h if isinstance(h, str) else "" for h in hex_encodes]
+        lengths = np.fromiter((len(h) // 4 for h in hex_encodes), dtype=np.int64, count=len(hex_encodes))
+
+        # Incomplete trailing data is ignored like in split
+        buffer = bytes.fromhex("".join(h[:n * 4] for h, n in zip(hex_encodes, lengths)))
+        data = np.frombuffer(buffer, dtype=DATUM_DTYPE)
+
+        data_type = ((data >> 8) & ((1 << 6) - 1)).astype(np.uint8)
+        value = (data & ((1 << 8) - 1)).astype(np.uint8)
+        undo_flag = (data & (1 << 15)).astype(bool)
+        state_flag = (data & (1 << 14)).astype(bool)
+        entry_id = np.repeat(np.arange(len(hex_encodes)), lengths)
+
+        return data_type, value, undo_flag, state_flag, entry_id
+
     @staticmethod
     def join(iterator):
         """
@@ -27,64 +138,179 @@ class Entry:
         :return: Hex string
         """
 
-        def generate_datum_hex():
-            for t, v, u, s in iterator:
-                yield str(hex(u << 15 | s << 14 | t << 8 | v))[2:].zfill(4)
+        t, v, u, s = np.array(list(iterator), dtype=np.int64).reshape(-1, 4).T
+        data = (u & 1) << 15 | (s & 1) << 14 | (t & ((1 << 6) - 1)) << 8 | (v & ((1 << 8) - 1))
+
+        return data.astype(DATUM_DTYPE).tobytes().hex()
+
+    @classmethod
+    def from_frame(cls, frame, board_finder, store=None, columns=None):
+        """
+        Creates entries for every row of a DataFrame at once
+        Reads whole columns instead of one row at a time, looks up each
+        distinct board once, and decodes all data in one pass
+        :param frame: DataFrame of entry info, indexed by the index column
+        :param board_finder: finder used to look up boards
+        :param store: EventStore of the rows in order, decoded from the Data column if not given
+        :param columns: ColumnLoader for the columns not in the frame
+        :return: A list of entries that are views into the store
+        """
+
+        if store is None:
+            store = EventStore.from_hex(frame["Data"])
+
+        boards = {name: board_finder.get_board_by_name(name) for name in frame["Board"].unique()}
+
+        names = list(frame.columns)
+        rows = zip(frame.index.tolist(), *(frame[name].tolist() for name in names))
 
-        return "".join(generate_datum_hex())
+        entries = [cls(dict(zip(names, values)), board_finder, store=store, position=position,
+                       columns=columns, index=index, board=boards[values[names.index("Board")]])
+                   for position, (index, *values) in enumerate(rows)]
 
-    def __init__(self, info, board_finder):
+        # Check the data types of all entries against their boards at once
+        type_counts = np.array([len(entry.board.logs) for entry in entries], dtype=np.int64)
+        if len(store.entry):
+            invalid = store.data_index >= type_counts[store.entry]
+            for position in np.unique(store.entry[invalid]):
+                entries[position].print_error()
+
+        return entries
+
+    def __init__(self, info, board_finder, store=None, position=0, columns=None, index=None, board=None):
         self.team = info["Team"]
         self.match = info["Match"]
         self.name = info["Name"]
-        self.start_time = info["StartTime"]
-        self.comments = info["Comments"]
         self.encoded_data = info["Data"]
-        self.decoded_data = []
 
-        self.board = board_finder.get_board_by_name(info["Board"])
+        # Columns left out of info are read from the loader when first used
+        self.columns = columns
+        self.index = index
+        self._start_time = info.get("StartTime")
+        self._comments = info.get("Comments")
+
+        # Entries in a store are views that only build lists when needed
+        self.store = store
+        self.position = position
+        self._decoded_data = None
+        self._type_index = None
+
+        self.board = board if board is not None else board_finder.get_board_by_name(info["Board"])
+
+        if store is None:
+            try:
+                self.decode()
+            except TypeError:
+                self.print_error()
+
+    def print_error(self):
+        """Reports an entry with data types that are not on its board"""
+        print("Error!!!")
+        print("match: ", self.match)
+        print("team: ", self.team)
+        print("board: ", self.board.name())
+        print()
 
-        try:
+    @property
+    def start_time(self):
+        if self._start_time is None and self.columns is not None:
+            self._start_time = self.columns.get("StartTime", self.index)
+        return self._start_time
+
+    @start_time.setter
+    def start_time(self, start_time):
+        self._start_time = start_time
+
+    @property
+    def comments(self):
+        if self._comments is None and self.columns is not None:
+            self._comments = self.columns.get("Comments", self.index)
+        return self._comments
+
+    @comments.setter
+    def comments(self, comments):
+        self._comments = comments
+
+    @property
+    def decoded_data(self):
+        """The list of [log, state, value, undo] items, built on first use"""
+        if self._decoded_data is None:
             self.decode()
-        except TypeError:
-            print("Error!!!")
-            print("match: ", self.match)
-            print("team: ", self.team)
-            print("board: ", self.board.name())
-            print()
+        return self._decoded_data
+
+    @decoded_data.setter
+    def decoded_data(self, decoded_data):
+        self._decoded_data = decoded_data
+        self._type_index = None
 
     def decode(self):
-        self.decoded_data = []
-        for t, v, u, s in self.split(self.encoded_data):
+        if self.store is None:
+            split_data = self.split(self.encoded_data)
+        else:
+            split_data = zip(*(a.tolist() for a in self.store.events(self.position)))
+
+        self._decoded_data = []
+        self._type_index = None
+        for t, v, u, s in split_data:
             try:
-                self.decoded_data.append([self.board.log(t), bool(s), v, bool(u)])
+                self._decoded_data.append([self.board.log(t), bool(s), v, bool(u)])
             except TypeError:
                 print(t, v, u, s)
                 raise TypeError()
 
-        return self.decoded_data
+        return self._decoded_data
 
     def encode(self):
         def generate_numerical_tuple():
             for tt, ss, vv, uu in self.decoded_data:
-                yield (self.board.data_index_from_log(tt), int(vv), int(uu), int(ss))
+                t = self.board.data_index_from_log(tt)
+                if t != -1:
+                    yield (t, int(vv), int(uu), int(ss))
 
         self.encoded_data = self.join(generate_numerical_tuple())
 
+        # The decoded data may have been edited in place before encoding
+        self.data_edited()
+
         return self.encoded_data
 
+    def data_edited(self):
+        """
+        Drops the index of values by type after the decoded data has been edited in place
+        """
+
+        self._type_index = None
+
+    def type_index(self):
+        """
+        Gets the values of the data that are not undone, grouped by log string
+        The index is built once and rebuilt after the decoded data changes
+        :return: A dictionary of log string to the list of values in order
+        """
+
+        if self._type_index is None:
+            index = {}
+            if self._decoded_data is None and self.store is not None:
+                data_index, value, undo, _ = self.store.events(self.position)
+                kept = ~undo & (data_index < len(self.board.logs))
+                for tt, vv in zip(self.board.log_array[data_index[kept]], value[kept].tolist()):
+                    index.setdefault(tt, []).append(vv)
+            else:
+                for tt, ss, vv, uu in self.decoded_data:
+                    if not uu:
+                        index.setdefault(tt, []).append(vv)
+            self._type_index = index
+        return self._type_index
+
     def look(self, type_str):
-        r = []
-        for tt, ss, vv, uu in self.decoded_data:
-            if tt == type_str and not uu:
-                r.append(vv)
-        return r
+        return list(self.type_index().get(type_str, ()))
 
     def count(self, type_str):
-        return len(self.look(type_str))
+        return len(self.type_index().get(type_str, ()))
 
     def final_value(self, type_str, default=0):
-        looked_list = self.look(type_str)
+        looked_list = self.type_index().get(type_str)
         if looked_list:
             return looked_list[-1]
         return default
+
@@ -0,0 +1,147 @@
+"""
+Indexes of the entry columns used to filter the verification list, kept
+up to date as entries are added so that searches don't go through every row
+"""
+
+from bisect import bisect_left, insort
+
+
+class PrefixIndex:
+    """
+    Finds rows by the start of a value, using a sorted list of the distinct values as text
+    """
+
+    def __init__(self):
+        self.keys = []  # Sorted distinct keys
+        self.rows = {}  # Key to the set of rows having it
+
+    def add(self, value, row):
+        key = str(value)
+        rows = self.rows.get(key)
+        if rows is None:
+            insort(self.keys, key)
+            rows = self.rows[key] = set()
+        rows.add(row)
+
+    def remove(self, value, row):
+        key = str(value)
+        rows = self.rows.get(key)
+        if rows is not None:
+            rows.discard(row)
+            if not rows:
+                del self.rows[key]
+                del self.keys[bisect_left(self.keys, key)]
+
+    def search(self, prefix):
+        """
+        :return: The set of rows with a value starting with prefix
+        """
+
+        prefix = str(prefix)
+        found = set()
+        for i in range(bisect_left(self.keys, prefix), len(self.keys)):
+            if not self.keys[i].startswith(prefix):
+                break
+            found.update(self.rows[self.keys[i]])
+        return found
+
+
+class SubstringIndex:
+    """
+    Finds rows by any part of a value, ignoring case. Values are looked up
+    through the n-grams they contain, then checked to actually contain the term
+    """
+
+    N = 3
+
+    def __init__(self):
+        self.rows = {}  # Lowercase value to the set of rows having it
+        self.grams = {}  # N-gram to the set of lowercase values containing it
+
+    def ngrams(self, key):
+        return {key[i:i + self.N] for i in range(len(key) - self.N + 1)}
+
+    def add(self, value, row):
+        key = str(value).lower()
+        rows = self.rows.get(key)
+        if rows is None:
+            rows = self.rows[key] = set()
+            for gram in self.ngrams(key):
+                self.grams.setdefault(gram, set()).add(key)
+        rows.add(row)
+
+    def remove(self, value, row):
+        key = str(value).lower()
+        rows = self.rows.get(key)
+        if rows is not None:
+            rows.discard(row)
+            if not rows:
+                del self.rows[key]
+                for gram in self.ngrams(key):
+                    self.grams[gram].discard(key)
+                    if not self.grams[gram]:
+                        del self.grams[gram]
+
+    def search(self, term):
+        """
+        :return: The set of rows with a value containing term
+        """
+
+        term = str(term).lower()
+        grams = self.ngrams(term)
+
+        if grams:
+            candidates = set.intersection(*(self.grams.get(gram, set()) for gram in grams))
+        else:
+            candidates = self.rows.keys()  # Short terms are checked against every distinct value
+
+        found = set()
+        for key in candidates:
+            if term in key:
+                found.update(self.rows[key])
+        return found
+
+
+class SearchIndex:
+    """
+    The indexes of the Match, Team and Name columns of the edited entries
+    """
+
+    def __init__(self):
+        self.indexes = {"Match": PrefixIndex(),
+                        "Team": PrefixIndex(),
+                        "Name": SubstringIndex()}
+
+    def add_rows(self, entries):
+        """
+        Adds entries to the indexes
+        :param entries: A DataFrame of entries, indexed by row
+        """
+
+        for column, index in self.indexes.items():
+            for row, value in zip(entries.index.tolist(), entries[column].tolist()):
+                index.add(value, row)
+
+    def update_row(self, row, old_values, new_values):
+        """
+        Moves a row to its new values in the indexes
+        :param old_values: A dictionary of column to the value before the change
+        :param new_values: A dictionary of column to the value after the change
+        """
+
+        for column, index in self.indexes.items():
+            if old_values[column] != new_values[column]:
+                index.remove(old_values[column], row)
+                index.add(new_values[column], row)
+
+    def search(self, column, terms):
+        """
+        Finds the rows matching any of the terms in a column. Match and Team
+        are matched by prefix, and Name by a part of the name ignoring case
+        :return: The set of matching rows
+        """
+
+        found = set()
+        for term in terms:
+            found.update(self.indexes[column].search(term))
+        return found
@@ -1,15 +1,75 @@
 import os
 import time
+from bisect import insort
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from re import compile
 
 import numpy as np
 import pandas as pd
 
 from src.model import database, format_time, boards, entrylib
+from src.model.verification.search_index import SearchIndex
 
 FILTER_HEADER = ['Match', 'Team', 'Name', "Board", "Edited"]
 FILTER_SORT = ['Match', 'Team']
 
+ENTRY_MATCHER = compile(r"\d{1,3}_\d{1,4}_[^_]+_[0-9a-f]{8}_[0-9a-f]{8}_([0-9a-f]{4})*_.*")
+
+# Less data than this, in bytes, is not worth starting worker processes for. Files are
+# parsed at about 25 MB/s, while starting each spawned worker takes about a second
+PARALLEL_BYTES = 64 * 1024 * 1024
+
+# Board finders loaded by each worker process, by board directory
+_worker_finders = {}
+
+
+def read_scan_file(f_path, offset, board_finder):
+    """
+    Reads and parses the complete lines of one CSV file from a byte offset
+    A line still being written is read again next time
+    :param f_path: path to the CSV file
+    :param offset: byte offset to start reading from
+    :param board_finder: finder used to look up board names
+    :return: The unique rows that pass the format test in RAW_HEADER order,
+    the number of lines that passed, and the byte offset read up to
+    """
+
+    read_file = open(f_path, "rb")
+    read_file.seek(offset)
+    content = read_file.read()
+    read_file.close()
+
+    # Only the complete lines are parsed
+    content = content[:content.rfind(b"\n") + 1]
+    end_offset = offset + len(content)
+
+    matched_entries = []
+    for line in content.decode("utf-8", "replace").splitlines():
+        entry = "".join(line.split(",")[:-1])
+        if ENTRY_MATCHER.match(entry) is not None:
+            matched_entries.append(entry)
+
+    rows = []
+    for entry in dict.fromkeys(matched_entries):
+        split = entry.split("_")
+        rows.append((int(split[0]),
+                     int(split[1]),
+                     split[2],
+                     format_time.display_time(int(split[3], 16)),
+                     board_finder.get_board_by_id(int(split[4], 16)).name(),
+                     split[5],
+                     split[6]))
+
+    return rows, len(matched_entries), end_offset
+
+
+def _read_scan_file_in_worker(f_path, offset, board_dir_path):
+    """Runs read_scan_file in a worker process, loading the boards once per process"""
+    if board_dir_path not in _worker_finders:
+        _worker_finders[board_dir_path] = boards.Finder(board_dir_path)
+    return read_scan_file(f_path, offset, _worker_finders[board_dir_path])
+
 
 class VerificationManager:
     """Data model manager for verifying scouting entries"""
@@ -39,8 +99,26 @@ class VerificationManager:
 
         self.board_finder = boards.Finder(board_dir_path)
 
+        # Edited entries whose data is encoded in bulk when needed
+        self.pending_edits = {}
+
+        # Indexes of the rows changed since the last save
+        self.dirty_raw = set()
+        self.dirty_edited = set()
+
+        # Indexes of the Match, Team and Name columns of the edited entries for searching
+        self.search_index = SearchIndex()
+
+        # (match, team, name) to the sorted rows of the edited entries having them
+        self.row_keys = {}
+
+        # New edited entries, added to the edited entries together when they are next used
+        self.append_buffer = []
+        self._edited_entries = None
+
         if os.path.exists(db_path):
-            conn = database.get_engine(db_path).connect()
+            self.engine = database.open_engine(db_path)
+            conn = self.engine.connect()
             self.raw_entries = pd.read_sql(sql="SELECT * FROM RAW_ENTRIES",
                                            con=conn,
                                            index_col="index")
@@ -49,9 +127,17 @@ class VerificationManager:
                                               con=conn,
                                               index_col="index")
             conn.close()
+            self.scan_manifest = database.read_scan_manifest(self.engine)
+            self.search_index.add_rows(self.edited_entries)
+            self.add_row_keys(self.edited_entries)
+            self.raw_keys = set(self.raw_entries[list(database.RAW_HEADER.keys())].itertuples(index=False,
+                                                                                             name=None))
         else:
+            self.engine = database.open_engine(db_path)
             self.raw_entries = pd.DataFrame(columns=database.RAW_HEADER.keys())
             self.edited_entries = pd.DataFrame(columns=database.EDITED_HEADER.keys())
+            self.scan_manifest = {}
+            self.raw_keys = set()
             self.update()
             self.save()
 
@@ -63,10 +149,14 @@ class VerificationManager:
         """
 
         if index in self.edited_entries.index:
+            if index in self.pending_edits:
+                self.encode_pending()
+
             row = self.edited_entries.iloc[index]
             raw = None
-            if row["RawIndex"] in self.raw_entries.index:
-                raw = entrylib.Entry(self.raw_entries.iloc[row["RawIndex"]], self.board_finder)
+            # RawIndex is read back as a float, since entries added by hand have none
+            if pd.notna(row["RawIndex"]) and int(row["RawIndex"]) in self.raw_entries.index:
+                raw = entrylib.Entry(self.raw_entries.loc[int(row["RawIndex"])], self.board_finder)
             edited = entrylib.Entry(row, self.board_finder)
             last_edit_time = row["Edited"]
 
@@ -74,6 +164,40 @@ class VerificationManager:
 
         raise IndexError()
 
+    @property
+    def edited_entries(self):
+        if self.append_buffer:
+            self.flush_appends()
+        return self._edited_entries
+
+    @edited_entries.setter
+    def edited_entries(self, value):
+        self._edited_entries = value
+
+    def flush_appends(self):
+        """
+        Adds the entries in the append buffer to the edited entries in one pass
+        """
+
+        start = len(self._edited_entries)
+        new_data = pd.DataFrame(self.append_buffer,
+                                columns=database.EDITED_HEADER.keys(),
+                                index=pd.RangeIndex(start, start + len(self.append_buffer)))
+        self.append_buffer = []
+
+        self._edited_entries = pd.concat([self._edited_entries, new_data], ignore_index=True)
+        self.search_index.add_rows(new_data)
+
+    def add_row_keys(self, entries):
+        """
+        Adds entries to the index of rows by match, team and name
+        :param entries: A DataFrame of entries, indexed by row
+        """
+
+        keys = zip(entries["Match"].tolist(), entries["Team"].tolist(), entries["Name"].tolist())
+        for row, key in zip(entries.index.tolist(), keys):
+            self.row_keys.setdefault(key, []).append(row)
+
     def __setitem__(self, index, value: entrylib.Entry):
         """
         Sets a modified entry object into the manager
@@ -82,72 +206,126 @@ class VerificationManager:
         """
 
         if index in self.edited_entries.index:
-            value.encode()
+            # The decoded data is edited in place by the UI, so values by type are looked up again
+            value.data_edited()
+            self.pending_edits[index] = value
+            self.dirty_edited.add(index)
+
+            old_values = self.edited_entries.loc[index, ["Match", "Team", "Name"]].to_dict()
+            new_values = {"Match": value.match, "Team": value.team, "Name": value.name}
+            self.search_index.update_row(index, old_values, new_values)
+
+            old_key = (old_values["Match"], old_values["Team"], old_values["Name"])
+            new_key = (value.match, value.team, value.name)
+            if old_key != new_key:
+                self.row_keys[old_key].remove(index)
+                if not self.row_keys[old_key]:
+                    del self.row_keys[old_key]
+                insort(self.row_keys.setdefault(new_key, []), index)
 
             self.edited_entries.at[index, "Match"] = value.match
             self.edited_entries.at[index, "Team"] = value.team
             self.edited_entries.at[index, "Name"] = value.name
             self.edited_entries.at[index, "StartTime"] = value.start_time
             self.edited_entries.at[index, "Comments"] = value.comments
-            self.edited_entries.at[index, "Data"] = value.encoded_data
             self.edited_entries.at[index, "Edited"] = format_time.display_time(time.time())
             return
 
         raise IndexError()
 
-    def update(self):
+    def encode_pending(self):
+        """
+        Encodes the data of all entries set since the last call in one pass
+        """
+
+        if self.pending_edits:
+            indexes = list(self.pending_edits.keys())
+            entries = list(self.pending_edits.values())
+
+            for index, entry, encoded_data in zip(indexes, entries, entrylib.EventStore.from_entries(entries).to_hex()):
+                entry.encoded_data = encoded_data
+                entry.data_edited()
+                self.edited_entries.at[index, "Data"] = encoded_data
+
+            self.pending_edits.clear()
+
+    def update(self, workers=None):
         """
         Updates the two analysis with new data saved in the csv dir path
-        Directly replaces the raw data table
-        Attempts to merge the raw data into the edited data
-        :return: The number of new items imported
+        Only reads files that are new or have grown since the last update,
+        starting from where the last update stopped reading
+        Attempts to merge the new raw data into the edited data
+        :param workers: number of processes that parse files at once. By default, \
+        all cores are used only when there is more than PARALLEL_BYTES to read
+        :return: The number of new items imported, and the number of duplicates dropped
+        """
+
+        paths, offsets, stats = [], [], []
+        for f in self.list_files(self.csv_dir_path):
+            stat = os.stat(f)
+            size, mtime, offset = self.scan_manifest.get(f, (None, None, 0))
+
+            if (stat.st_size, stat.st_mtime) == (size, mtime):
+                continue
+
+            # The file has been replaced rather than appended to
+            if stat.st_size < offset:
+                offset = 0
+
+            paths.append(f)
+            offsets.append(offset)
+            stats.append(stat)
+
+        if workers is None:
+            unread_bytes = sum(stat.st_size - offset for stat, offset in zip(stats, offsets))
+            workers = os.cpu_count() if unread_bytes >= PARALLEL_BYTES else 1
+
+        # Results are in the order of the files either way
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_read_scan_file_in_worker,
+                                            paths, offsets, repeat(self.board_dir_path)))
+        else:
+            results = [read_scan_file(f, offset, self.board_finder) for f, offset in zip(paths, offsets)]
+
+        # Keep the first of identical rows, and leave out the entries imported by previous updates
+        header = list(database.RAW_HEADER.keys())
+        new_rows = {}
+        matched_count = 0
+        for f, stat, (rows, file_matched_count, offset) in zip(paths, stats, results):
+            self.scan_manifest[f] = (stat.st_size, stat.st_mtime, offset)
+            matched_count += file_matched_count
+            for row in rows:
+                if row not in self.raw_keys:
+                    new_rows.setdefault(row, None)
+        self.raw_keys.update(new_rows.keys())
+        new_rows = list(new_rows.keys())
+
+        start = self.raw_entries.index.max() + 1 if not self.raw_entries.empty else 0
+        new_data = pd.DataFrame(new_rows,
+                                columns=header,
+                                index=pd.RangeIndex(start, start + len(new_rows)))
+
+        self.raw_entries = pd.concat([self.raw_entries, new_data])
+        self.dirty_raw.update(new_data.index)
+        self.merge(new_data)
+
+        return len(new_data), matched_count - len(new_data)
+
+    def merge(self, raw_entries=None):
         """
+        Adds raw entries that are not in the edited data yet
+        :param raw_entries: the raw entries to merge, defaults to all of them
+        """
+
+        if raw_entries is None:
+            raw_entries = self.raw_entries
 
-        def read_one(f_path):
-            """Read the contents of one CSV file"""
-            read_file = open(f_path, "r")
-            entries = read_file.readlines()
-            read_file.close()
-            for entry in entries:
-                yield "".join(entry.split(",")[:-1])
-
-        def read_all():
-            """Read all found files and returns ordered unique entries that pass the format test"""
-            matcher = compile("\d{1,3}_\d{1,4}_[^_]+_[0-9a-f]{8}_[0-9a-f]{8}_([0-9a-f]{4})*_.*")
-            unique_entries = []
-
-            for f in self.list_files(self.csv_dir_path):
-                for entry in read_one(f):
-                    if matcher.match(entry) is not None:
-                        if entry not in unique_entries:
-                            unique_entries.append(entry)
-
-            return unique_entries
-
-        def make_columns(entry):
-            """Make the columns to put in the database"""
-            split = entry.split("_")
-            return {"Match": int(split[0]),
-                    "Team": int(split[1]),
-                    "Name": split[2],
-                    "StartTime": format_time.display_time(int(split[3], 16)),
-                    "Board": self.board_finder.get_board_by_id(int(split[4], 16)).name(),
-                    "Data": split[5],
-                    "Comments": split[6]
-                    }
-
-        # Create the DataFrame
-        # TODO Must make unique entries so that we don't rely on older system
-        self.raw_entries = pd.DataFrame([make_columns(e) for e in read_all()],
-                                        columns=database.RAW_HEADER.keys())
-        self.merge()
-
-    def merge(self):
         # Compute a boolean array indicating the add values to raw
-        condition = ~self.raw_entries.index.isin(self.edited_entries["RawIndex"].dropna())
+        condition = ~raw_entries.index.isin(self.edited_entries["RawIndex"].dropna())
 
         # Filter by the condition to get new data values
-        new_data = self.raw_entries[condition].reset_index()
+        new_data = raw_entries[condition].reset_index()
 
         new_data.rename(columns={"index": "RawIndex"},
                         inplace=True)
@@ -156,24 +334,35 @@ class VerificationManager:
         new_data = new_data[list(database.EDITED_HEADER.keys())]
 
         # Add new data to the edited table
+        start = len(self.edited_entries)
         self.edited_entries = pd.concat([self.edited_entries, new_data],
                                         ignore_index=True)
+        self.dirty_edited.update(self.edited_entries.index[start:])
+        self.search_index.add_rows(self.edited_entries.iloc[start:])
+        self.add_row_keys(self.edited_entries.iloc[start:])
 
     def save(self):
-        conn = database.get_engine(self.db_path).connect()
-        self.raw_entries.to_sql(name="RAW_ENTRIES",
-                                con=conn,
-                                if_exists="replace",
-                                dtype=database.RAW_HEADER
-                                )
-
-        self.edited_entries.to_sql(name="EDITED_ENTRIES",
-                                   con=conn,
-                                   if_exists="replace",
-                                   dtype=database.EDITED_HEADER,
-                                   index_label="index")
+        """
+        Writes the rows changed since the last save to the database in one transaction
+        """
+
+        self.encode_pending()
+
+        with self.engine.begin() as conn:
+            database.upsert_entries(conn, "RAW_ENTRIES", database.RAW_HEADER,
+                                    self.raw_entries.loc[sorted(self.dirty_raw)])
+            dirty_edited = self.edited_entries.loc[sorted(self.dirty_edited)]
+            database.upsert_entries(conn, "EDITED_ENTRIES", database.EDITED_HEADER, dirty_edited)
+            database.write_events(conn, dirty_edited.index, dirty_edited["Data"])
+            database.write_scan_manifest(conn, self.scan_manifest)
+        database.checkpoint(self.engine)
+
+        self.dirty_raw.clear()
+        self.dirty_edited.clear()
 
     def write_csv(self, target_path):
+        self.encode_pending()
+
         target_file = open(target_path, "w")
         for _, row in self.search().iterrows():
             items = map(str, [row["Match"],
@@ -208,34 +397,14 @@ class VerificationManager:
         # Clean the input keyword arguments
         search_rules = {k.capitalize(): kwargs[k] for k in kwargs.keys() if kwargs[k]}
 
-        if "Match" in search_rules.keys():
-            matches = search_rules["Match"]
-            possible_matches = set()
-            for available_match in self.edited_entries["Match"].unique():
-                for match in matches:
-                    if str(available_match).startswith(str(match)):
-                        possible_matches.add(available_match)
-            search_rules["Match"] = possible_matches
-
-        if "Team" in search_rules.keys():
-            teams = search_rules["Team"]
-            possible_teams = set()
-            for available_team in self.edited_entries["Team"].unique():
-                for team in teams:
-                    if str(available_team).startswith(str(team)):
-                        possible_teams.add(available_team)
-            search_rules["Team"] = possible_teams
-
-        if "Name" in search_rules.keys():
-            names = search_rules["Name"]
-            possible_names = set()
-            for available_name in self.edited_entries["Name"].unique():
-                for name in names:
-                    if name.lower() in available_name.lower():
-                        possible_names.add(available_name)
-            search_rules["Name"] = possible_names
-
-        results = self.edited_entries
+        # Match, Team and Name are found through the search index
+        rows = None
+        for column in ("Match", "Team", "Name"):
+            if column in search_rules.keys():
+                found = self.search_index.search(column, search_rules.pop(column))
+                rows = found if rows is None else rows & found
+
+        results = self.edited_entries if rows is None else self.edited_entries.loc[sorted(rows)]
 
         for i in search_rules.keys():
             if i in FILTER_HEADER:
@@ -251,13 +420,12 @@ class VerificationManager:
         :param name:
         :return: a matching row, or an empty DataFrame if entry doesn't exist
         """
-        return self.edited_entries[(self.edited_entries["Match"] == match) &
-                                   (self.edited_entries["Team"] == team) &
-                                   (self.edited_entries["Name"] == name)]
+        return self.edited_entries.loc[self.row_keys.get((match, team, name), [])]
 
     def append(self, **kwargs):
         """
-        Add a new entry to the data
+        Add a new entry to the data. New entries are kept in a buffer until
+        the edited entries are next used, so adding many entries is fast
         :param kwargs: entry info dictionary
         :return: The new entry info, or old if match, team, and name already exists
         """
@@ -268,10 +436,10 @@ class VerificationManager:
         team = entry_data.get("Team")
         name = entry_data.get("Name")
 
-        matching_row = self.match_row(match, team, name)
+        matching_rows = self.row_keys.get((match, team, name))
 
-        if matching_row.empty:
-            new_data = pd.DataFrame([{
+        if not matching_rows:
+            new_data = {
                 "Match": match,
                 "Team": team,
                 "Name": name,
@@ -282,10 +450,13 @@ class VerificationManager:
                 "RawIndex": np.nan,
                 "Edited": ""
 
-            }], columns=database.EDITED_HEADER.keys())
+            }
 
-            self.edited_entries = pd.concat([self.edited_entries, new_data], ignore_index=True)
+            row = len(self._edited_entries) + len(self.append_buffer)
+            self.append_buffer.append(new_data)
+            self.row_keys[(match, team, name)] = [row]
+            self.dirty_edited.add(row)
 
-            return self[self.match_row(match, team, name).index[0]]
+            return None, entrylib.Entry(new_data, self.board_finder), new_data["Edited"]
 
-        return self[matching_row.index[0]]
+        return self[matching_rows[0]]
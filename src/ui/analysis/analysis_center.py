@@ -1,42 +1,148 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtGui import QBrush, QColor
 from PyQt5.QtWidgets import QListWidgetItem, QFileDialog
 
 from src.model.analysis.analysis_manager import AnalysisManager
 from src.ui.analysis.analysis_ui import AnalysisUI
 
 
+class ComputeWorker(QThread):
+    """
+    Computes the tables of a manager away from the UI thread
+    """
+
+    table_computed = pyqtSignal(str)
+
+    def __init__(self, manager, names, tba_available=None, refresh=False, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.names = names
+        self.tba_available = tba_available
+        self.refresh = refresh
+
+    def run(self):
+        if self.refresh:
+            self.manager.load_entries()
+        self.manager.compute(self.names,
+                             tba_available=self.tba_available,
+                             on_table_computed=lambda table: self.table_computed.emit(table.name),
+                             refresh=self.refresh)
+
+
 class AnalysisCenter(AnalysisUI):
     def __init__(self, *args):
         super().__init__()
-        self.manager = AnalysisManager(*args)
+        self.manager = AnalysisManager(*args, lazy=True)
+        self.manager.tba_available = False
+        self.worker = None
+        self.queued_names = set()
+        self.queued_options = {"tba_available": None, "refresh": False}
         for title in self.manager.table_names():
             self.tables_nav.addItem(QListWidgetItem(title))
-            self.manager.compute_all(tba_available=False)
-        self.tables_nav.setCurrentRow(0)
+        self.update_computed_marks()
+        self.tables_nav.setCurrentRow(0)  # Computes the first table
 
         # self.table_content.update_contents("Raw Data", self.manager["raw_data"].data)
 
-    def on_table_nav_selected(self):
+    def compute_tables(self, names, tba_available=None, refresh=False):
+        """
+        Starts computing tables and the tables they depend on in the background,
+        or queues them if tables are already being computed
+        """
+
+        if self.worker is not None and self.worker.isRunning():
+            self.queued_names.update(names)
+            if tba_available is not None:
+                self.queued_options["tba_available"] = tba_available
+            self.queued_options["refresh"] |= refresh
+            return
+
+        needed = self.manager.with_dependencies(names)
+        self.progress_bar.setRange(0, len(needed))
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+
+        self.worker = ComputeWorker(self.manager, names, tba_available, refresh, self)
+        self.worker.table_computed.connect(self.on_table_computed)
+        self.worker.finished.connect(self.on_compute_finished)
+        self.worker.start()
+
+    def selected_table_name(self):
         selected = self.tables_nav.selectedItems()
         if selected:
-            new_table_name = self.manager.title_to_name(selected[0].text())
-            new_table = self.manager[new_table_name]
-            self.table_content.update_contents(new_table.title, new_table.data)
+            return self.manager.title_to_name(selected[0].text())
+        return None
+
+    def update_computed_marks(self):
+        """
+        Greys out the tables in the list that haven't been computed with the current entries and options
+        """
+
+        for i in range(self.tables_nav.count()):
+            item = self.tables_nav.item(i)
+            computed = self.manager.is_computed(self.manager.title_to_name(item.text()))
+            item.setForeground(QBrush() if computed else QBrush(QColor("gray")))
+
+    def on_table_computed(self, name):
+        self.progress_bar.setValue(self.progress_bar.value() + 1)
+        self.update_computed_marks()
+
+        if name == self.selected_table_name():
+            self.show_selected_table()
+
+    def on_compute_finished(self):
+        self.progress_bar.hide()
+        self.update_computed_marks()
+
+        if self.queued_names or self.queued_options["refresh"]:
+            names, options = self.queued_names, self.queued_options
+            self.queued_names = set()
+            self.queued_options = {"tba_available": None, "refresh": False}
+            self.compute_tables(names, **options)
+
+    def show_selected_table(self):
+        name = self.selected_table_name()
+        if name is not None:
+            table = self.manager[name]
+            self.table_content.update_contents(table.title, table.data)
             self.table_content.table.scrollToTop()
 
+    def on_table_nav_selected(self):
+        name = self.selected_table_name()
+        if name is not None:
+            self.show_selected_table()
+            if not self.manager.is_computed(name):
+                self.compute_tables([name])
+
     def on_calculate_with_tba(self):
-        self.manager.compute_all(tba_available=True)
-        self.on_table_nav_selected()
+        self.calculate(tba_available=True)
 
     def on_calculate_without_tba(self):
-        self.manager.compute_all(tba_available=False)
-        self.on_table_nav_selected()
+        self.calculate(tba_available=False)
+
+    def calculate(self, tba_available):
+        """
+        Reloads the entries, fetches TBA and files again and computes the selected
+        table. Other tables are computed again when they are selected or exported
+        """
+
+        name = self.selected_table_name()
+        self.compute_tables([name] if name is not None else [], tba_available, refresh=True)
+
+    def wait_for_tables(self):
+        if self.worker is not None:
+            self.worker.wait()
 
     def on_open_tables_in_excel(self):
+        self.wait_for_tables()
         self.manager.open_excel_instance()
+        self.update_computed_marks()
 
     def on_save_csv_in_folder(self):
         path_input = QFileDialog.getExistingDirectory(None,
                                                       "Open Scripts Folder",
                                                       "")
         if path_input:
+            self.wait_for_tables()
             self.manager.save_csv_folder(path_input)
+            self.update_computed_marks()
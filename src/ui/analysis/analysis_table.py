@@ -1,19 +1,116 @@
-import math
 import sys
 
 import numpy as np
 import pandas as pd
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import *
 
+# The number of rows looked at to size each column
+WIDTH_SAMPLE_SIZE = 50
+
+
+class DataFrameModel(QAbstractTableModel):
+    """
+    Serves the cells of a DataFrame to a view as they are shown, without copying them
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.data_frame = pd.DataFrame()
+        self.columns = []
+        self.rows = np.arange(0)  # The row of the DataFrame shown at each row of the view
+
+    def set_data_frame(self, data: "pd.DataFrame"):
+        self.beginResetModel()
+        self.data_frame = data
+        self.columns = [data.iloc[:, j].to_numpy() for j in range(data.columns.size)]
+        self.rows = np.arange(data.index.size)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def cell(self, row, column):
+        """
+        Gets a cell as a Python value, or None if it is empty
+        """
+
+        value = self.columns[column][self.rows[row]]
+        if isinstance(value, np.generic):
+            value = value.item()
+        if type(value) is float and np.isnan(value):
+            return None
+        return value
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+
+        if role == Qt.DisplayRole:
+            value = self.cell(index.row(), index.column())
+            return QVariant() if value is None else value
+
+        if role == Qt.TextAlignmentRole:
+            value = self.cell(index.row(), index.column())
+            if type(value) is int or type(value) is float:
+                return Qt.AlignRight | Qt.AlignVCenter
+            return Qt.AlignLeft | Qt.AlignVCenter
+
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal:
+            return str(self.data_frame.columns[section])
+        return str(self.data_frame.index[self.rows[section]])
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """
+        Sorts by finding the order of the rows with NumPy, leaving the DataFrame as it is
+        """
+
+        self.layoutAboutToBeChanged.emit()
+
+        if column < 0 or column >= len(self.columns):
+            self.rows = np.arange(self.data_frame.index.size)
+        else:
+            values = self.columns[column]
+            nulls = pd.isna(values)
+            if values.dtype.kind not in "biuf":
+                # Columns of numbers stored as objects or text are still sorted as numbers
+                numbers = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+                if np.isnan(numbers).sum() == nulls.sum():
+                    values = numbers
+                else:  # Mixed types can't be compared, so sort them as text
+                    values = np.array([str(v) for v in values])
+
+            # Sorting by rank lets descending order flip the key instead of the rows,
+            # which keeps ties in their order. Empty cells are always put last
+            ranks = np.zeros(len(values), dtype=np.int64)
+            ranks[~nulls] = np.unique(values[~nulls], return_inverse=True)[1]
+            if order == Qt.DescendingOrder:
+                ranks = -ranks
+            self.rows = np.lexsort((ranks, nulls))
+
+        self.layoutChanged.emit()
+
 
 class AnalysisTable(QWidget):
     def __init__(self, parent):
         super().__init__(parent=parent, flags=Qt.Widget)
 
-        self.table = QTableWidget(self)
+        self.model = DataFrameModel(self)
+
+        self.table = QTableView(self)
+        self.table.setModel(self.model)
         self.table.setAlternatingRowColors(True)
+        self.table.setSortingEnabled(True)
+        self.table.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 8)
 
         layout = QVBoxLayout()
         layout.addWidget(self.table)
@@ -26,39 +123,32 @@ class AnalysisTable(QWidget):
 
         self.setWindowTitle(title)
         self.setUpdatesEnabled(False)
-        self.table.clear()
-        self.table.setRowCount(data.index.size)
-        self.table.setColumnCount(data.columns.size)
-        for i in range(data.index.size):
-            for j in range(data.columns.size):
-                item = QTableWidgetItem()
-                item.setFlags(item.flags() ^ Qt.ItemIsEditable)
-
-                cell = data.iat[i, j]
-
-                if type(cell) is str:
-                    item.setData(Qt.DisplayRole, cell)
-                    item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                elif math.isnan(cell):
-                    pass
-                else:
-                    scalar = np.asscalar(cell)
-                    item.setData(Qt.DisplayRole, scalar)
-                    if type(scalar) is int or type(scalar) is float:
-                        item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                    else:
-                        item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-
-                self.table.setItem(i, j, item)
-
-        self.table.setHorizontalHeaderLabels(map(str, data.columns))
-        self.table.setVerticalHeaderLabels(map(str, data.index))
-        self.table.resizeColumnsToContents()
-        self.table.resizeRowsToContents()
-        self.table.setSortingEnabled(True)
+        self.model.set_data_frame(data)
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.resize_columns()
         self.setUpdatesEnabled(True)
         self.update()
 
+    def resize_columns(self):
+        """
+        Sizes the columns to fit their header and a sample of their cells,
+        so that the time taken doesn't grow with the number of rows
+        """
+
+        metrics = self.table.fontMetrics()
+        header_metrics = self.table.horizontalHeader().fontMetrics()
+
+        row_count = self.model.rowCount()
+        sample = np.unique(np.linspace(0, row_count - 1, min(row_count, WIDTH_SAMPLE_SIZE)).astype(int))
+
+        for column in range(self.model.columnCount()):
+            width = header_metrics.width(self.model.headerData(column, Qt.Horizontal)) + 24
+            for row in sample:
+                value = self.model.cell(row, column)
+                if value is not None:
+                    width = max(width, metrics.width(str(value)) + 12)
+            self.table.setColumnWidth(column, width)
+
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
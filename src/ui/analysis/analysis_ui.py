@@ -17,6 +17,9 @@ class AnalysisUI(QMainWindow):
 
         self.table_content = AnalysisTable(self)
 
+        self.progress_bar = QProgressBar(self)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+
         self.setup_menus()
         self.setup_event_handlers()
         self.setup_view_states()
@@ -66,7 +69,8 @@ class AnalysisUI(QMainWindow):
         self.tables_nav.itemSelectionChanged.connect(self.on_table_nav_selected)
 
     def setup_view_states(self):
-        pass
+        self.progress_bar.setFormat("%v of %m tables computed")
+        self.progress_bar.hide()
 
     def setup_styles(self):
         pass
@@ -100,7 +104,7 @@ class AnalysisUI(QMainWindow):
         super().resizeEvent(event)
 
         top = self.menuBar().height()  # get the reduced height
-        w_height = self.height()
+        w_height = self.height() - self.statusBar().height()
         w_width = self.width()
 
         self.tables_nav.move(4, top + 4)
@@ -1,6 +1,6 @@
 import sys
 
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
 from PyQt5.QtWidgets import *
 
 INDEXES = {'Data Types': 0,
@@ -9,14 +9,132 @@ INDEXES = {'Data Types': 0,
 
 HEADERS = INDEXES.keys()
 
+# The items of each data row shown in each column of the table
+COLUMNS = list(INDEXES.values())
+
+
+class EntryDataModel(QAbstractTableModel):
+    """
+    The data of an entry as a table of data types, values and undo states.
+    Rows are kept as [log, state, value, undo] lists like Entry.decoded_data
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.data_types = []
+        self.editable = False
+
+    def set_data(self, data, data_types, editable):
+        self.beginResetModel()
+        self.rows = [list(row) for row in data]
+        self.data_types = data_types
+        self.editable = editable
+        self.endResetModel()
+
+    def append_row(self, row):
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows))
+        self.rows.append(list(row))
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+
+        item = COLUMNS[index.column()]
+        value = self.rows[index.row()][item]
+
+        if item == INDEXES['Undo']:
+            if role == Qt.CheckStateRole:
+                return Qt.Checked if value else Qt.Unchecked
+            return QVariant()
+
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return "" if value is None else str(value)
+
+        return QVariant()
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or not self.editable:
+            return False
+
+        item = COLUMNS[index.column()]
+        row = self.rows[index.row()]
+
+        if item == INDEXES['Undo'] and role == Qt.CheckStateRole:
+            row[item] = value == Qt.Checked
+
+        elif item == INDEXES['Data Types'] and role == Qt.EditRole:
+            if value not in self.data_types:
+                return False
+            row[item] = value
+
+        elif item == INDEXES['Values'] and role == Qt.EditRole:
+            str_value = str(value).strip()
+            if not str_value.isdigit() or not 0 < int(str_value) < 256:
+                return False
+            row[item] = int(str_value)
+
+        else:
+            return False
+
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if self.editable:
+            if COLUMNS[index.column()] == INDEXES['Undo']:
+                flags |= Qt.ItemIsUserCheckable
+            else:
+                flags |= Qt.ItemIsEditable
+        return flags
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return list(HEADERS)[section]
+        return QVariant()
+
+
+class DataTypeDelegate(QStyledItemDelegate):
+    """
+    Edits the data type of a row with a combo box, made only while the cell is being edited
+    """
 
-class EntryDetailsWidget(QWidget):
     class ModifiedComboBox(QComboBox):
 
         # Fix mouse wheel issues that accidentally change data
         def wheelEvent(self, e):
             pass
 
+    def createEditor(self, parent, option, index):
+        type_chooser = self.ModifiedComboBox(parent)
+        type_chooser.setFocusPolicy(Qt.StrongFocus)
+        type_chooser.addItems(index.model().data_types)
+        type_chooser.activated.connect(lambda _: self.commitData.emit(type_chooser))
+        return type_chooser
+
+    def setEditorData(self, editor, index):
+        data_type = index.data(Qt.EditRole)
+        if data_type not in index.model().data_types:
+            editor.insertItem(0, data_type)
+        editor.setCurrentText(data_type)
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.EditRole)
+
+
+class EntryDetailsWidget(QWidget):
+
     def __init__(self, parent, editable):
         super().__init__(parent=parent, flags=Qt.Widget)
 
@@ -25,10 +143,20 @@ class EntryDetailsWidget(QWidget):
         self.editable = editable
         self.user_edited = False
 
-        self.data_table = QTableWidget()
+        self.model = EntryDataModel(self)
+        self.model.dataChanged.connect(self.on_edited)
+
+        self.data_table = QTableView()
+        self.data_table.setModel(self.model)
+        self.data_table.setItemDelegateForColumn(COLUMNS.index(INDEXES['Data Types']), DataTypeDelegate(self))
+        self.data_table.setEditTriggers(QAbstractItemView.CurrentChanged |
+                                        QAbstractItemView.SelectedClicked |
+                                        QAbstractItemView.DoubleClicked |
+                                        QAbstractItemView.EditKeyPressed)
         self.data_table.doubleClicked.connect(self.on_double_click)
 
         self.data_table.verticalHeader().setVisible(False)
+        self.data_table.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 12)
 
         self.layout = QVBoxLayout()
         self.layout.addWidget(self.data_table)
@@ -41,80 +169,32 @@ class EntryDetailsWidget(QWidget):
 
         self.user_edited = False
 
-        row_count = len(self.data)
-        column_count = len(HEADERS)
-
         self.setUpdatesEnabled(False)
 
-        self.data_table.clear()
-
-        self.data_table.setRowCount(row_count)
-        self.data_table.setColumnCount(column_count)
-        self.data_table.disconnect()
-
-        for row in range(len(self.data)):
-            for column in range(len(self.data[row])):
-
-                if column == INDEXES['Data Types']:
-                    type_chooser = self.ModifiedComboBox()
-                    if self.data[row][column] is None or self.data[row][column] not in self.data_types:
-                        type_chooser.addItem(None)
-
-                    type_chooser.addItems(self.data_types)
-                    type_chooser.setCurrentText(str(self.data[row][column]))
-                    type_chooser.setEnabled(self.editable)
-                    type_chooser.setFocusPolicy(Qt.StrongFocus)
-                    type_chooser.currentTextChanged.connect(self.on_edited)
-
-                    self.data_table.setCellWidget(row, list(INDEXES.keys()).index('Data Types'), type_chooser)
-
-                elif column == INDEXES['Undo']:
-                    undo_checker = QCheckBox()
-                    undo_checker.setCheckState(2 if self.data[row][column] else 0)
-                    undo_checker.setEnabled(self.editable)
-                    undo_checker.stateChanged.connect(self.on_edited)
-                    self.data_table.setCellWidget(row, list(INDEXES.keys()).index('Undo'), undo_checker)
-
-                elif column == INDEXES['Values']:
-                    value_item = QTableWidgetItem(str(self.data[row][column]))
-                    if not self.editable:
-                        value_item.setFlags(value_item.flags() ^ Qt.ItemIsEditable)
-                    self.data_table.setItem(row,
-                                            list(INDEXES.keys()).index('Values'),
-                                            value_item)
-
-        self.data_table.setHorizontalHeaderLabels(HEADERS)
-        self.data_table.resizeColumnsToContents()
+        self.model.set_data(self.data, self.data_types, self.editable)
+        self.resize_columns()
         self.data_table.scrollToTop()
 
-        self.data_table.itemChanged.connect(self.on_edited)
-
         self.setUpdatesEnabled(True)
 
         self.update()
 
+    def resize_columns(self):
+        """
+        Sizes the columns from the data types of the board, without going through the rows
+        """
+
+        metrics = self.data_table.fontMetrics()
+        type_width = max([metrics.width(data_type) for data_type in self.data_types] or [0]) + 40
+
+        self.data_table.setColumnWidth(COLUMNS.index(INDEXES['Data Types']), type_width)
+        self.data_table.setColumnWidth(COLUMNS.index(INDEXES['Values']), metrics.width("Values") + 24)
+        self.data_table.setColumnWidth(COLUMNS.index(INDEXES['Undo']), metrics.width("Undo") + 24)
+
     def update_data(self):
 
         for r in range(len(self.data)):
-            for c in range(len(self.data[r])):
-
-                if c == INDEXES['Data Types']:
-                    combo_box = self.data_table.cellWidget(r, list(INDEXES.keys()).index('Data Types'))
-                    self.data[r][c] = self.data_types[combo_box.currentIndex()]
-
-                elif c == INDEXES['Undo']:
-                    check_box = self.data_table.cellWidget(r, list(INDEXES.keys()).index('Undo'))
-                    if check_box.checkState() == 2:
-                        self.data[r][c] = True
-                    else:
-                        self.data[r][c] = False
-
-                elif c == INDEXES['Values']:
-                    str_value = self.data_table.item(r, list(INDEXES.keys()).index('Values')).text()
-                    if str_value.isdigit():
-                        int_value = int(str_value)
-                        if 0 < int_value < 256:
-                            self.data[r][c] = int_value
+            self.data[r][:] = self.model.rows[r]
 
     def on_double_click(self):
         pass
@@ -124,7 +204,7 @@ class EntryDetailsWidget(QWidget):
 
     def add_row(self):
         self.data.append([None, False, 0, False])
-        self.update_table_widget(self.data, self.data_types)
+        self.model.append_row(self.data[-1])
         self.data_table.scrollToBottom()
 
 
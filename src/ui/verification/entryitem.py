@@ -1,54 +1,136 @@
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, QVariant
+from PyQt5.QtGui import QColor, QFont
 from PyQt5.QtWidgets import *
 
 from src.model.boards import Finder
 
+# Roles the delegate uses to read the parts of an entry
+ENTRY_INDEX_ROLE = Qt.UserRole
+TEAM_ROLE = Qt.UserRole + 1
+MATCH_ROLE = Qt.UserRole + 2
+NAME_ROLE = Qt.UserRole + 3
+EDITED_ROLE = Qt.UserRole + 4
 
-class EntryInfoListItemWidget(QWidget):
+ALLIANCE_COLORS = {"red": "#FF0000", "blue": "#0000FF"}
 
-    def __init__(self, parent, index, entry_info, board_finder: Finder):
-        super().__init__(parent, flags=Qt.Widget)
 
-        self.db_index = index
+class EntryListModel(QAbstractListModel):
+    """
+    A list of entries found by a search, with one row per entry
+    """
 
-        self.match = entry_info["Match"]
-        self.team = entry_info["Team"]
-        self.name = entry_info["Name"]
-        self.board_name = entry_info["Board"]
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.db_indexes = []
+        self.teams = []
+        self.matches = []
+        self.names = []
+        self.colors = []
+        self.edited = []
+        self.rows = {}  # Database index to row
 
-        self.team_label = QLabel(str(self.team))
-        self.team_label.setFixedWidth(50)
+    def set_entries(self, entries, board_finder: Finder):
+        """
+        Replaces the entries in the list
+        :param entries: A DataFrame of entries, indexed by their database index
+        """
 
-        color = "#808080"
-        if board_finder:
-            board = board_finder.get_board_by_name(entry_info["Board"])
-            alliance = board.alliance()
-            if alliance == "red":
-                color = "#FF0000"
-            if alliance == "blue":
-                color = "#0000FF"
+        self.beginResetModel()
 
-        self.team_label.setStyleSheet("QLabel{font:bold; color:" + color + "}")
-        self.match_label = QLabel(str(self.match))
-        self.match_label.setFixedWidth(50)
-        self.name_label = QLabel(str(self.name))
-        self.board_label = QLabel(str(self.board_name))
-        self.edited_label = QLabel("✓" if entry_info["Edited"].strip() else "")
-        self.edited_label.setFixedWidth(20)
-        self.edited_label.setStyleSheet("QLabel{color:#00a000}")
+        # Look up each board only once
+        colors = {}
+        for board_name in entries["Board"].unique():
+            color = "#808080"
+            if board_finder:
+                alliance = board_finder.get_board_by_name(board_name).alliance()
+                color = ALLIANCE_COLORS.get(alliance, color)
+            colors[board_name] = QColor(color)
 
-        layout = QHBoxLayout()
-        layout.addWidget(self.team_label)
-        layout.addWidget(self.match_label)
-        layout.addWidget(self.name_label)
-        # layout.addWidget(self.board_label)
-        layout.addWidget(self.edited_label)
+        self.db_indexes = entries.index.tolist()
+        self.teams = [str(team) for team in entries["Team"].tolist()]
+        self.matches = [str(match) for match in entries["Match"].tolist()]
+        self.names = [str(name) for name in entries["Name"].tolist()]
+        self.colors = [colors[board_name] for board_name in entries["Board"].tolist()]
+        self.edited = [bool(str(edited).strip()) for edited in entries["Edited"].tolist()]
+        self.rows = {db_index: row for row, db_index in enumerate(self.db_indexes)}
 
-        self.setLayout(layout)
+        self.endResetModel()
 
-        self.setMinimumSize(150, 40)
-        self.resize(150, 40)
-        self.show()
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.db_indexes)
 
-    def update_edited_state(self, state):
-        self.edited_label.setText("✓" if state else "")
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+
+        row = index.row()
+        if role == Qt.DisplayRole:
+            return "{} {} {}".format(self.teams[row], self.matches[row], self.names[row])
+        if role == ENTRY_INDEX_ROLE:
+            return self.db_indexes[row]
+        if role == TEAM_ROLE:
+            return self.teams[row]
+        if role == MATCH_ROLE:
+            return self.matches[row]
+        if role == NAME_ROLE:
+            return self.names[row]
+        if role == EDITED_ROLE:
+            return self.edited[row]
+        if role == Qt.ForegroundRole:
+            return self.colors[row]
+        return QVariant()
+
+    def update_edited_state(self, db_index, state):
+        """
+        Shows whether an entry has been edited, if it is in the list
+        """
+
+        row = self.rows.get(db_index)
+        if row is not None and self.edited[row] != state:
+            self.edited[row] = state
+            model_index = self.index(row)
+            self.dataChanged.emit(model_index, model_index, [EDITED_ROLE])
+
+
+class EntryItemDelegate(QStyledItemDelegate):
+    """
+    Paints the team, match, scout name and edited mark of an entry in the list
+    """
+
+    def paint(self, painter, option, index):
+        # Draw the background and selection without any text
+        item_option = QStyleOptionViewItem(option)
+        self.initStyleOption(item_option, index)
+        item_option.text = ""
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.CE_ItemViewItem, item_option, painter, option.widget)
+
+        rect = option.rect.adjusted(10, 0, -10, 0)
+        selected = option.state & QStyle.State_Selected
+        text_color = option.palette.highlightedText().color() if selected else option.palette.text().color()
+
+        painter.save()
+
+        bold = QFont(option.font)
+        bold.setBold(True)
+        painter.setFont(bold)
+        painter.setPen(index.data(Qt.ForegroundRole))
+        painter.drawText(QRect(rect.left(), rect.top(), 50, rect.height()),
+                         Qt.AlignLeft | Qt.AlignVCenter, index.data(TEAM_ROLE))
+
+        painter.setFont(option.font)
+        painter.setPen(text_color)
+        painter.drawText(QRect(rect.left() + 56, rect.top(), 50, rect.height()),
+                         Qt.AlignLeft | Qt.AlignVCenter, index.data(MATCH_ROLE))
+        painter.drawText(QRect(rect.left() + 112, rect.top(), rect.width() - 138, rect.height()),
+                         Qt.AlignLeft | Qt.AlignVCenter, index.data(NAME_ROLE))
+
+        if index.data(EDITED_ROLE):
+            painter.setPen(QColor("#00a000"))
+            painter.drawText(QRect(rect.right() - 20, rect.top(), 20, rect.height()),
+                             Qt.AlignLeft | Qt.AlignVCenter, "✓")
+
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        return QSize(150, 40)
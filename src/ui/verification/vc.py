@@ -1,6 +1,7 @@
 from PyQt5.QtWidgets import QFileDialog
 
 from src.model.verification.vcmanager import VerificationManager
+from src.ui.verification.entryitem import ENTRY_INDEX_ROLE
 from src.ui.verification.vcwindow import VerificationWindow
 
 
@@ -21,23 +22,22 @@ class VerificationCenter(VerificationWindow):
     def read_working_entry_changes(self):
         # Read the edited data
         if self.working_index != -1 and self.details.user_edited:
-            if self.last_selected:
-                entry_item = self.filtered_entries.itemWidget(self.last_selected)
-                entry_item.update_edited_state(True)
+            if self.last_selected is not None:
+                self.entry_model.update_edited_state(self.last_selected, True)
             self.details.update_data()
             self.working_entry.comments = self.current_entry_comments.text()
             self.manager[self.working_index] = self.working_entry
             self.log.setText("Copied Changes to RAM: #" + str(self.working_index))
 
     def on_entry_selected(self):
-        selected = self.filtered_entries.selectedItems()
+        selected = self.filtered_entries.selectedIndexes()
         if selected:
             self.read_working_entry_changes()
 
-            entry_item = self.filtered_entries.itemWidget(selected[0])
-            self.original_entry, self.working_entry, last_edited = self.manager[entry_item.db_index]
+            db_index = selected[0].data(ENTRY_INDEX_ROLE)
+            self.original_entry, self.working_entry, last_edited = self.manager[db_index]
 
-            self.working_index = entry_item.db_index
+            self.working_index = db_index
 
             self.current_entry_match_number.setText(str(self.working_entry.match))
             self.current_entry_team_number.setText(str(self.working_entry.team))
@@ -52,13 +52,13 @@ class VerificationCenter(VerificationWindow):
             self.original_details.update_table_widget(self.original_entry.decoded_data,
                                                       self.original_entry.board.list_logs())
 
-            self.last_selected = selected[0]
+            self.last_selected = db_index
 
     def on_update(self):
         self.log.setText("Updating")
-        self.manager.update()
+        new_count, duplicate_count = self.manager.update()
         self.on_filter_edited()
-        self.log.setText("Updated")
+        self.log.setText("Updated: {} new entries, {} duplicates dropped".format(new_count, duplicate_count))
 
     def on_save(self):
         self.log.setText("Saving")
@@ -77,15 +77,13 @@ class VerificationCenter(VerificationWindow):
         names = self.filter_scout_name.text().split(",")
         names = [name.strip() for name in names if name.strip()]
 
-        self.filtered_entries.clear()
-        for index, row in self.manager.search(match=matches,
-                                              team=teams,
-                                              name=names).iterrows():
-            self.add_entry_item(index, row, self.manager.board_finder)
+        self.entry_model.set_entries(self.manager.search(match=matches,
+                                                         team=teams,
+                                                         name=names),
+                                     self.manager.board_finder)
 
-        if self.filtered_entries.count() > 0:
-            self.filtered_entries.setCurrentRow(0)
-            self.working_index = 0
+        if self.entry_model.rowCount() > 0:
+            self.filtered_entries.setCurrentIndex(self.entry_model.index(0))  # Sets the working index
         else:
             self.working_index = -1
 
@@ -1,11 +1,14 @@
 import sys
 
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import *
 
 from src.ui.verification.entrydetails import EntryDetailsWidget
-from src.ui.verification.entryitem import EntryInfoListItemWidget
+from src.ui.verification.entryitem import EntryListModel, EntryItemDelegate
+
+# How long to wait after the last keystroke in a filter before searching, in milliseconds
+FILTER_DELAY = 150
 
 
 class VerificationWindow(QMainWindow):
@@ -16,7 +19,15 @@ class VerificationWindow(QMainWindow):
 
         self.setWindowTitle("Verification Center")
 
-        self.filtered_entries = QListWidget(self)
+        self.entry_model = EntryListModel(self)
+        self.filtered_entries = QListView(self)
+        self.filtered_entries.setModel(self.entry_model)
+        self.filtered_entries.setItemDelegate(EntryItemDelegate(self.filtered_entries))
+        self.filtered_entries.setUniformItemSizes(True)
+
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DELAY)
 
         self.details = EntryDetailsWidget(self, True)
         self.original_details = EntryDetailsWidget(self, False)
@@ -52,10 +63,11 @@ class VerificationWindow(QMainWindow):
         self.details.read()
 
     def setup_event_handlers(self):
-        self.filtered_entries.itemSelectionChanged.connect(self.on_entry_selected)
-        self.filter_team_number.textEdited.connect(self.on_filter_edited)
-        self.filter_match_number.textEdited.connect(self.on_filter_edited)
-        self.filter_scout_name.textEdited.connect(self.on_filter_edited)
+        self.filtered_entries.selectionModel().selectionChanged.connect(self.on_entry_selected)
+        self.filter_timer.timeout.connect(self.on_filter_edited)
+        self.filter_team_number.textEdited.connect(self.filter_timer.start)
+        self.filter_match_number.textEdited.connect(self.filter_timer.start)
+        self.filter_scout_name.textEdited.connect(self.filter_timer.start)
         self.add_item_in_current_entry.textEdited.connect(self.on_add_item_clicked)
         self.remove_item_in_current_entry.textEdited.connect(self.on_remove_item_clicked)
 
@@ -114,17 +126,6 @@ class VerificationWindow(QMainWindow):
             widget.move(x, y)
             widget.setFixedSize(width, height)
 
-    def add_entry_item(self, index, data, finder):
-        custom_widget = EntryInfoListItemWidget(parent=self.filtered_entries,
-                                                index=index,
-                                                entry_info=data,
-                                                board_finder=finder)
-
-        widget_item = QListWidgetItem(self.filtered_entries)
-        widget_item.setSizeHint(custom_widget.sizeHint())
-        self.filtered_entries.addItem(widget_item)
-        self.filtered_entries.setItemWidget(widget_item, custom_widget)
-
     def setup_menus(self):
         """Set up the menus that is part of the UI"""
 